@@ -33,7 +33,9 @@ setup(
     install_requires=['flask', 'flask_cors', 'flask_restful', 'Flask-SocketIO', 'flask-login', 'parade', 'arrow', 'cerberus', 'palettable'],
 
     extras_require={
-        "dash": ["dash", "dash-html-components", "dash-core-components", "dash-table", "flask-caching"],
+        "dash": ["dash>=2.16,<3", "plotly>=5.18,<6", "dash-html-components", "dash-core-components", "dash-table", "flask-caching"],
+        "geo": ["shapely"],
+        "brotli": ["brotli"],
     },
 
     packages=find_packages('src'),
@@ -0,0 +1,53 @@
+# -*- coding:utf-8 -*-
+import sys
+
+from parade.command import ParadeCommand
+
+
+class BenchCommand(ParadeCommand):
+    requires_workspace = False
+
+    def run_internal(self, context, **kwargs):
+        from ..server.bench import run_suite, save_results, load_baseline, compare, format_result, format_header
+
+        rows = int(kwargs.get('rows'))
+        cols = int(kwargs.get('cols'))
+        iterations = int(kwargs.get('iterations'))
+        warmup = int(kwargs.get('warmup'))
+        baseline = load_baseline(kwargs['baseline']) if kwargs.get('baseline') else None
+        threshold = float(kwargs.get('threshold'))
+
+        print(format_header(with_baseline=baseline is not None))
+
+        def report(result):
+            print(format_result(result, compare([result], baseline, threshold) if baseline else None))
+            sys.stdout.flush()
+
+        results = run_suite(rows=rows, cols=cols, iterations=iterations, warmup=warmup,
+                            patterns=kwargs.get('case'), log_lines=int(kwargs.get('log_lines')), callback=report)
+
+        if kwargs.get('save'):
+            save_results(results, kwargs['save'], rows=rows, cols=cols, iterations=iterations)
+
+        if baseline:
+            regressions = [name for name, (_, regressed) in compare(results, baseline, threshold).items() if regressed]
+            if regressions:
+                print('performance regressions: ' + ', '.join(regressions))
+                sys.exit(1)
+
+    def short_desc(self):
+        return 'benchmark the api and dashboard render paths of parade server'
+
+    def config_parser(self, parser):
+        from ..server.bench import DEFAULT_ITERATIONS, DEFAULT_WARMUP, DEFAULT_THRESHOLD, DEFAULT_LOG_LINES
+        from ..server.bench.workspace import DEFAULT_ROWS, DEFAULT_COLS
+        parser.add_argument('--rows', default=DEFAULT_ROWS, help='the rows of the generated data')
+        parser.add_argument('--cols', default=DEFAULT_COLS, help='the numeric columns of the generated data')
+        parser.add_argument('-n', '--iterations', default=DEFAULT_ITERATIONS, help='the timed iterations of each case')
+        parser.add_argument('--warmup', default=DEFAULT_WARMUP, help='the untimed iterations of each case')
+        parser.add_argument('--log-lines', default=DEFAULT_LOG_LINES, help='the lines of the benchmarked job log')
+        parser.add_argument('-c', '--case', action='append', help='the glob pattern of the cases to run')
+        parser.add_argument('--save', help='save the results into the baseline file')
+        parser.add_argument('--baseline', help='compare the results against the baseline file')
+        parser.add_argument('--threshold', default=DEFAULT_THRESHOLD,
+                            help='the relative slowdown of the median latency reported as a regression')
@@ -0,0 +1,75 @@
+# -*- coding:utf-8 -*-
+from parade.command import ParadeCommand
+
+
+class LoadTestCommand(ParadeCommand):
+    requires_workspace = False
+
+    def run_internal(self, context, **kwargs):
+        from ..server.bench.load import DashboardScenario, load_dashboard_configs, run_stage, find_saturation, \
+            format_stage, start_synthetic_server, synthetic_credentials
+
+        users = [int(u) for u in str(kwargs.get('users')).split(',')]
+        duration = float(kwargs.get('stage_duration'))
+        slo = float(kwargs['slo']) if kwargs.get('slo') else None
+        url = kwargs.get('url')
+
+        process = None
+        if url:
+            configs = load_dashboard_configs(kwargs.get('workspace') or '.')
+            credentials = tuple(kwargs['auth'].split(':', 1)) if kwargs.get('auth') else None
+        else:
+            from ..server.bench.workspace import make_dashboard_config
+            process, url = start_synthetic_server(int(kwargs.get('rows')), int(kwargs.get('cols')))
+            configs = {'synthetic': make_dashboard_config()}
+            credentials = synthetic_credentials()
+
+        scenarios = [DashboardScenario(name, config) for name, config in configs.items()]
+        assert scenarios, 'no dashboard to load'
+
+        stages = []
+        try:
+            for stage_users in users:
+                stage = run_stage(url, scenarios, stage_users, duration, credentials=credentials,
+                                  think_time=float(kwargs.get('think_time')),
+                                  interactions=int(kwargs.get('interactions')))
+                stages.append(stage)
+                print(format_stage(stage))
+                saturated, reason = find_saturation(stages, slo=slo)
+                if saturated and not kwargs.get('full'):
+                    break
+        finally:
+            if process is not None:
+                process.terminate()
+
+        saturated, reason = find_saturation(stages, slo=slo)
+        if saturated:
+            sustained = [stage.users for stage in stages if stage.users < saturated.users]
+            print('saturated at {} users ({}), max sustainable users: {}'.format(
+                saturated.users, reason, max(sustained) if sustained else 'none'))
+        else:
+            print('not saturated up to {} users'.format(stages[-1].users))
+
+    def short_desc(self):
+        return 'load test the dashboards of parade server with simulated concurrent users'
+
+    def config_parser(self, parser):
+        from ..server.bench.load import DEFAULT_USERS, DEFAULT_STAGE_DURATION, DEFAULT_THINK_TIME, \
+            DEFAULT_INTERACTIONS
+        from ..server.bench.workspace import DEFAULT_ROWS, DEFAULT_COLS
+        parser.add_argument('--url', help='the url of the running parade server, '
+                                          'a server of the synthetic workspace is started if not provided')
+        parser.add_argument('--workspace', help='the workspace of the dashboard configs of the running server')
+        parser.add_argument('--auth', help='the login of the running server in format `username:password`')
+        parser.add_argument('-u', '--users', default=','.join(str(u) for u in DEFAULT_USERS),
+                            help='the comma-separated concurrent users of the ramp stages')
+        parser.add_argument('-d', '--stage-duration', default=DEFAULT_STAGE_DURATION,
+                            help='the duration in seconds of every stage')
+        parser.add_argument('--think-time', default=DEFAULT_THINK_TIME,
+                            help='the mean think time in seconds between the user interactions')
+        parser.add_argument('--interactions', default=DEFAULT_INTERACTIONS,
+                            help='the filter interactions of every dashboard visit')
+        parser.add_argument('--slo', help='the p95 latency objective in seconds')
+        parser.add_argument('--full', action='store_true', help='run all stages after the saturation')
+        parser.add_argument('--rows', default=DEFAULT_ROWS, help='the rows of the synthetic data')
+        parser.add_argument('--cols', default=DEFAULT_COLS, help='the numeric columns of the synthetic data')
@@ -24,7 +24,11 @@ def load_dashboards(app, context, name=None):
 def load_dashboards_by_config(app, context, name=None):
     import os
     import yaml
+    from .dash.dataset import DatasetRegistry, load_workspace_datasets
     d = {}
+    # the datasets are shared by all dashboards
+    datasets = DatasetRegistry(context, load_workspace_datasets(context),
+                               timeout=context.conf.get_or_else('dash.dataset.timeout', 10))
     dash_dir = os.path.join(context.workdir, 'dashboard')
     if os.path.exists(dash_dir):
         dash_configs = [f for f in os.listdir(dash_dir) if os.path.isfile(os.path.join(dash_dir, f))]
@@ -34,7 +38,8 @@ def load_dashboards_by_config(app, context, name=None):
                 if not config_dict:
                     continue
                 dash_name = os.path.splitext(os.path.basename(dash_config))[0]
-                dashboard = ConfigurableDashboard(app, context, config_name=dash_name, config=config_dict)
+                dashboard = ConfigurableDashboard(app, context, config_name=dash_name, config=config_dict,
+                                                  datasets=datasets)
                 if name and dash_name != name:
                     continue
                 d[dash_name] = dashboard
@@ -55,16 +60,21 @@ def load_contrib_apis(app, context):
             pass
 
 
-def _load_dash(app, context):
+def _load_dash(app, context, enable_warmup=True):
     import dash_html_components as html
     import dash_core_components as dcc
-    from dash.dependencies import Input, Output
+
+    from .dash.instrument import init_instrument
+    from .dash.layout import init_layout_route, init_navigation, nav_link_id
+    from .dash.scope import init_callback_scope
+    from .dash.supersede import init_abandon_route
+    init_instrument(app.server, context)
 
     # load the dashboards
     dashboards = load_dashboards_by_config(app, context)
     # load the dashboard options
-    dashboard_links = [dcc.Link(dashboards[dashkey].display_name, href='/dashboard/' + dashkey, className='active') for
-                       dashkey in dashboards]
+    dashboard_links = [dcc.Link(dashboards[dashkey].display_name, href='/dashboard/' + dashkey, className='active',
+                                id=nav_link_id(idx)) for idx, dashkey in enumerate(dashboards)]
 
     dash_layout = [
         dcc.Location(id='dash-url', refresh=False),
@@ -93,32 +103,18 @@ def _load_dash(app, context):
 
     banner_no_dash = '请选择报表'
 
-    @app.callback(Output("dash-content", "children"),
-                  [Input('dash-url', 'pathname')])
-    def render_content(path):
-        if path:
-            path_tab = path[len('/dashboard/'):]
-            if len(path_tab) == 0:
-                path_tab = None
-
-            tab = path_tab
-            if tab in dashboards:
-                return dashboards[tab].layout
-        return html.Div([html.H1(banner_no_dash)])
-
-    @app.callback(Output("dash-nav", "children"),
-                  [Input('dash-url', 'pathname')])
-    def render_content(path):
-        if path:
-            path_tab = path[len('/dashboard/'):]
-            if len(path_tab) == 0:
-                path_tab = None
-
-            tab = path_tab
-            if tab in dashboards:
-                return [dcc.Link(dashboards[dashkey].display_name, href='/dashboard/' + dashkey,
-                                 className='active' if tab == dashkey else 'inactive') for dashkey in dashboards]
-        return [dcc.Link(dashboards[dashkey].display_name, href='/dashboard/' + dashkey) for dashkey in dashboards]
+    # the dashboard layouts are fetched with http caching and the navigation runs in the browser,
+    # re-scoping the callback graph to the switched dashboard
+    init_layout_route(app, dashboards)
+    init_navigation(app, dashboards, html.Div([html.H1(banner_no_dash)]))
+    init_callback_scope(app, dashboards)
+    init_abandon_route(app, dashboards)
+
+    # the cache warming runs in the serving process only, and can be disabled on all processes but one
+    # of the multi-process servers
+    if enable_warmup and str(context.conf.get_or_else('dash.warmup.enabled', True)).lower() == 'true':
+        from .dash.warmup import init_warmup
+        init_warmup(dashboards)
 
 
 def _init_web(context, enable_auth):
@@ -197,8 +193,12 @@ def _init_auth(app, context):
     app.register_blueprint(auth_api.bp)
 
 
-def start_webapp(context: Context, port=5000, enable_auth=True, enable_static=False, enable_dash=False,
-                 enable_socketio=True):
+def create_webapp(context: Context, enable_auth=True, enable_static=False, enable_dash=False, enable_socketio=True,
+                  enable_warmup=True):
+    """
+    create the wsgi app of the parade server
+    :return: the flask app, or the dispatcher of the flask app and the dash server if dash enabled
+    """
     import os
     from flask import Flask
     from flask_cors import CORS
@@ -209,16 +209,28 @@ def start_webapp(context: Context, port=5000, enable_auth=True, enable_static=Fa
     app = Flask(context.name, template_folder=template_dir, static_folder=static_dir)
     CORS(app)
 
+    from .compress import init_compress
+    init_compress(app, context)
+
     app.parade_context = context
 
+    from .pool import init_pools
+    init_pools(app, context)
+
     from parade.server.api import parade_blueprint
     app.register_blueprint(parade_blueprint)
 
+    from .metrics import bp as metrics_bp
+    app.register_blueprint(metrics_bp)
+
     load_contrib_apis(app, context)
 
     if enable_auth:
         _init_auth(app, context)
 
+    from .profiling import init_profiling
+    init_profiling(app, context)
+
     if enable_static or enable_dash:
         web_blueprint = _init_web(context, enable_auth)
         app.register_blueprint(web_blueprint)
@@ -226,7 +238,6 @@ def start_webapp(context: Context, port=5000, enable_auth=True, enable_static=Fa
     if enable_socketio:
         _init_socketio(app, context)
     context.webapp = app
-    debug = context.conf.get_or_else('debug', False)
 
     if enable_dash:
         import dash
@@ -237,12 +248,16 @@ def start_webapp(context: Context, port=5000, enable_auth=True, enable_static=Fa
         app_dash.css.config.serve_locally = True
         app_dash.scripts.config.serve_locally = True
 
-        _load_dash(app_dash, context)
+        _load_dash(app_dash, context, enable_warmup=enable_warmup)
+
+        from .dash.utils.geojson import bp as geojson_bp
+        app.register_blueprint(geojson_bp)
 
         def protect_views(app):
             from flask_login import login_required
             for view_func in app.server.view_functions:
-                if view_func.startswith(app.config.url_base_pathname):
+                if view_func.startswith(app.config.url_base_pathname) or \
+                        view_func.startswith(geojson_bp.name + '.'):
                     app.server.view_functions[view_func] = login_required(app.server.view_functions[view_func])
 
             return app
@@ -260,6 +275,18 @@ def start_webapp(context: Context, port=5000, enable_auth=True, enable_static=Fa
             '/dash': app_dash.server
         })
 
+    return app
+
+
+def start_webapp(context: Context, port=5000, enable_auth=True, enable_static=False, enable_dash=False,
+                 enable_socketio=True):
+    import os
+    # the reloader process also creates the app, only the serving process started by the reloader warms the caches
+    app = create_webapp(context, enable_auth=enable_auth, enable_static=enable_static, enable_dash=enable_dash,
+                        enable_socketio=enable_socketio, enable_warmup=os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
+    debug = context.conf.get_or_else('debug', False)
+
+    if enable_dash:
         from werkzeug.serving import run_simple
         run_simple('0.0.0.0', port, app, use_reloader=True, use_debugger=debug)
     else:
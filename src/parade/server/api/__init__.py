@@ -1,11 +1,13 @@
 # -*- coding:utf-8 -*-
 import sys
+import time
 import traceback
 
-from flask import Blueprint, current_app
+from flask import Blueprint, current_app, g, request
 from flask_restful import Resource, abort
 
 from parade.error import ParadeError
+from ..metrics import registry, DEFAULT_SIZE_BUCKETS
 
 
 class ParadeResource(Resource):
@@ -41,6 +43,60 @@ def catch_parade_error(func):
 
 parade_blueprint = Blueprint('parade', __name__)
 
+_request_seconds = registry.histogram('parade_api_request_seconds', 'Latency of the parade api requests',
+                                      ('endpoint', 'method', 'task'))
+_requests_total = registry.counter('parade_api_requests_total', 'Parade api requests by status code',
+                                   ('endpoint', 'method', 'task', 'status'))
+_requests_in_flight = registry.gauge('parade_api_requests_in_flight', 'Parade api requests in progress',
+                                     ('endpoint',))
+_response_bytes = registry.histogram('parade_api_response_bytes', 'Bytes of the parade api responses',
+                                     ('endpoint', 'method', 'task'), buckets=DEFAULT_SIZE_BUCKETS)
+
+
+_known_tasks = set()
+
+
+def _request_task():
+    """
+    get the task label of the request, the names not resolved to a task are labeled `other`
+    to keep the label values bounded
+    """
+    view_args = request.view_args or {}
+    name = view_args.get('name') or view_args.get('task')
+    if not name:
+        return ''
+    if name not in _known_tasks:
+        try:
+            current_app.parade_context.get_task(name)
+        except Exception:
+            return 'other'
+        _known_tasks.add(name)
+    return name
+
+
+@parade_blueprint.before_request
+def start_request_metrics():
+    g.parade_api_start = time.perf_counter()
+    g.parade_api_endpoint = request.endpoint
+    _requests_in_flight.inc(request.endpoint)
+
+
+@parade_blueprint.after_request
+def record_request_metrics(response):
+    if 'parade_api_start' in g:
+        labels = (request.endpoint, request.method, _request_task())
+        _request_seconds.observe(time.perf_counter() - g.parade_api_start, *labels)
+        _requests_total.inc(*labels, response.status_code)
+        if not response.is_streamed:
+            _response_bytes.observe(response.calculate_content_length() or 0, *labels)
+    return response
+
+
+@parade_blueprint.teardown_request
+def finish_request_metrics(exc):
+    if 'parade_api_start' in g:
+        _requests_in_flight.dec(g.parade_api_endpoint)
+
 from . import task
 from . import flow
 from . import exec
@@ -4,6 +4,7 @@ from flask import request, make_response
 from flask_restful import Api, reqparse
 
 from . import parade_blueprint, ParadeResource, catch_parade_error
+from ..tracing import span
 from parade.connection.localfile import LocalFile
 from parade.core.task import ETLTask
 
@@ -33,7 +34,8 @@ class DataAPI(ParadeResource):
         task_args = request.get_json() or {}
         data_task = self.context.get_task(name, task_class=ETLTask)
 
-        df = data_task.execute_internal(self.context, **task_args)
+        with span('parade.task.execute', task=name):
+            df = data_task.execute_internal(self.context, **task_args)
 
         if export:
             export_io, export_file = LocalFile.export(df, name, export_type=export)
@@ -28,6 +28,19 @@ def auth_required(f):
     return decorated
 
 
+def is_admin():
+    """
+    check if the current user is allowed to use the admin endpoints, e.g. the profiler and the metrics
+    :return: True if the logged-in user is an admin, or without auth in debug mode
+    """
+    from flask_login import current_user
+    auth_manager = getattr(current_app, 'auth_manager', None)
+    if auth_manager is None:
+        # no auth configured, only allowed in debug mode
+        return current_app.debug
+    return current_user.is_authenticated and auth_manager.is_admin(current_user)
+
+
 class AuthManager(object):
     _login_user = dict()
 
@@ -72,6 +85,16 @@ class AuthManager(object):
             return user
         return None
 
+    def is_admin(self, user):
+        """
+        This function check if the user is allowed to use the admin endpoints, e.g. the profiler
+        :param user: the loaded user
+        :return: True if the user is listed in `auth.admins`, no admin by default
+        """
+        from flask import current_app
+        admins = current_app.parade_context.conf.get_or_else('auth.admins', [])
+        return user.get_id() in admins
+
     def authenticate(self):
         """Sends a 401 response that enables basic auth"""
         return Response(
@@ -0,0 +1,270 @@
+# -*- coding:utf-8 -*-
+"""
+Benchmarks of the parade api and dashboard render paths.
+
+The benchmarks run against the synthetic workspace (see ``workspace``) and
+report the latency, throughput and peak memory of every case. The results
+can be saved as the baseline of later runs, which are then compared against
+it to catch the performance regressions before release::
+
+    parade bench --save baseline.json
+    parade bench --baseline baseline.json --threshold 0.2
+"""
+import copy
+import fnmatch
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+from .workspace import SyntheticContext, make_frame, make_gantt_frame, make_geojson, make_dashboard_config, \
+    DEFAULT_ROWS, DEFAULT_COLS
+
+DEFAULT_ITERATIONS = 20
+"""Default timed iterations of every case."""
+
+DEFAULT_WARMUP = 2
+"""Default untimed iterations before the timing."""
+
+DEFAULT_THRESHOLD = 0.2
+"""Default relative slowdown of the median latency to report as a regression."""
+
+DEFAULT_LOG_LINES = 100000
+"""Default lines of the job log."""
+
+
+class BenchCase(object):
+    """
+    A benchmark case, the `setup` builds the arguments of every call to `func`
+    and is not timed. The very fast functions are called `repeat` times per
+    iteration and timed on average.
+    """
+
+    def __init__(self, name, func, setup=None, repeat=1):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.repeat = repeat
+
+    def call(self):
+        args = self.setup() if self.setup else ()
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            self.func(*args)
+        return (time.perf_counter() - start) / self.repeat
+
+
+class BenchResult(object):
+    def __init__(self, name, timings, peak_memory):
+        self.name = name
+        self.timings = timings
+        self.peak_memory = peak_memory
+
+    @property
+    def iterations(self):
+        return len(self.timings)
+
+    @property
+    def mean(self):
+        return statistics.mean(self.timings)
+
+    @property
+    def p50(self):
+        return statistics.median(self.timings)
+
+    @property
+    def p95(self):
+        timings = sorted(self.timings)
+        return timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+
+    @property
+    def throughput(self):
+        return self.iterations / sum(self.timings) if sum(self.timings) > 0 else float('inf')
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'iterations': self.iterations,
+            'mean': self.mean,
+            'p50': self.p50,
+            'p95': self.p95,
+            'throughput': self.throughput,
+            'peak_memory': self.peak_memory,
+        }
+
+
+def run_case(case, iterations=DEFAULT_ITERATIONS, warmup=DEFAULT_WARMUP):
+    """
+    run the benchmark case, the peak memory is traced in an extra iteration to keep the timings unaffected
+    :param case: the benchmark case
+    :param iterations: the timed iterations
+    :param warmup: the untimed iterations before the timing
+    :return: the benchmark result
+    """
+    for _ in range(warmup):
+        case.call()
+    timings = [case.call() for _ in range(iterations)]
+
+    tracemalloc.start()
+    try:
+        case.call()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchResult(case.name, timings, peak_memory)
+
+
+def _chart_cases(context):
+    from ..dash.chart import load_chart_component_class
+
+    frame = make_frame(context.rows, context.cols)
+    small = make_frame(min(context.rows, 100), context.cols)
+    charts = {
+        'bar': (small, {}),
+        'pie': (small[['key', 'v0']], {}),
+        'scatter': (frame, {'mode': 'lines'}),
+        'scatter.downsample': (frame, {'mode': 'lines', 'max_points': 2000}),
+        'multiaxis': (frame, {'scattercolumn': ['v0']}),
+        'radar': (frame.drop(columns='key'), {'key': 'category', 'agg': 'mean'}),
+        'heatmap': (frame, {'x_column': 'category', 'y_column': 'v1', 'z_column': 'v0', 'y_bins': 50}),
+        'gantt': (make_gantt_frame(min(context.rows, 1000)), {}),
+        'indicator': ([{'title': 'v{}'.format(i), 'value': i * 10, 'reference': i} for i in range(context.cols)], {}),
+        'choropleth': (frame.groupby('category', as_index=False)['v0'].sum(),
+                       {'geojson_map': make_geojson(), 'featureidkey': 'properties.name', 'location': 'category',
+                        'z': 'v0'}),
+    }
+    for name, (data, args) in charts.items():
+        chart_class = load_chart_component_class(context, name.split('.')[0])
+        chart = chart_class(context, title=name, xlabel=None, ylabel=None)
+        yield BenchCase('chart.{}.create_figure'.format(name),
+                        lambda chart=chart, data=data, args=args: chart.create_figure(data, **args))
+
+
+def iter_cases(context, log_lines=DEFAULT_LOG_LINES):
+    """
+    iterate the benchmark cases on the synthetic workspace
+    :param context: the entered synthetic context
+    :param log_lines: the lines of the job log
+    :return: the benchmark cases
+    """
+    import os
+    import dash
+    from flask import Flask
+    from ..api import parade_blueprint
+    from ..auth import AuthManager
+    from ..dash import ConfigurableDashboard
+    from ..dash.table import load_table_component_class
+
+    app = Flask(context.name)
+    app.parade_context = context
+    app.register_blueprint(parade_blueprint)
+    client = app.test_client()
+
+    yield BenchCase('api.data.post', lambda: client.post('/api/data/frame', json={}).get_data())
+
+    yield from _chart_cases(context)
+
+    table = load_table_component_class(context, 'core')(context)
+    table_data = make_frame(min(context.rows, 1000), context.cols)
+    table_config = {'type': 'table', 'title': 'table', 'args': {'progress_columns': ['v0', 'v1'], 'page_size': 20}}
+    # the progress columns are consumed by the rendering
+    yield BenchCase('table.core.refresh_layout', table.refresh_layout,
+                    setup=lambda: (copy.deepcopy(table_config), table_data))
+
+    dashboard_config = make_dashboard_config()
+    yield BenchCase('dashboard.construct',
+                    lambda dash_app: ConfigurableDashboard(dash_app, context, config_name='bench',
+                                                           config=copy.deepcopy(dashboard_config)),
+                    setup=lambda: (dash.Dash(context.name, url_base_pathname='/dashboard/'),))
+
+    auth_manager = AuthManager()
+    token = auth_manager.login_user('bench')
+    yield BenchCase('auth.check_token', lambda: auth_manager.check_token('bench', token),
+                    repeat=1000)
+
+    logfile = os.path.join('executing', '1', 'tasks', 'frame')
+    os.makedirs(os.path.dirname(logfile), exist_ok=True)
+    with open(logfile, 'w') as f:
+        for idx in range(log_lines):
+            f.write('2020-01-01 00:00:00 [INFO] synthetic log line {} of the task execution\n'.format(idx))
+    yield BenchCase('api.exec.joblog', lambda: client.get('/api/exec/1/frame').get_data())
+
+
+def run_suite(rows=DEFAULT_ROWS, cols=DEFAULT_COLS, iterations=DEFAULT_ITERATIONS, warmup=DEFAULT_WARMUP,
+              patterns=None, log_lines=DEFAULT_LOG_LINES, callback=None):
+    """
+    run the benchmark suite on a new synthetic workspace
+    :param rows: the rows of the generated frames
+    :param cols: the numeric columns of the generated frames
+    :param iterations: the timed iterations of every case
+    :param warmup: the untimed iterations of every case
+    :param patterns: the glob patterns of the case names to run, all cases by default
+    :param log_lines: the lines of the job log
+    :param callback: the function called with every finished result
+    :return: the benchmark results
+    """
+    results = []
+    with SyntheticContext(rows=rows, cols=cols) as context:
+        for case in iter_cases(context, log_lines=log_lines):
+            if patterns and not any(fnmatch.fnmatch(case.name, pattern) for pattern in patterns):
+                continue
+            result = run_case(case, iterations=iterations, warmup=warmup)
+            results.append(result)
+            if callback:
+                callback(result)
+    return results
+
+
+def save_results(results, path, **meta):
+    """
+    save the results as the baseline
+    :param results: the benchmark results
+    :param path: the baseline file
+    :param meta: the settings of the run to record
+    """
+    meta = dict(meta, python=platform.python_version(), machine=platform.machine(), time=time.time())
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'results': [result.to_dict() for result in results]}, f, indent=2)
+
+
+def load_baseline(path):
+    """
+    load the saved results
+    :param path: the baseline file
+    :return: the baseline results dict [case name => result dict]
+    """
+    with open(path) as f:
+        return {result['name']: result for result in json.load(f)['results']}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    compare the median latency of the results against the baseline
+    :param results: the benchmark results
+    :param baseline: the baseline results dict
+    :param threshold: the relative slowdown to report as a regression
+    :return: the dict [case name => (the latency ratio to the baseline, regressed or not)]
+    """
+    comparison = {}
+    for result in results:
+        if result.name in baseline and baseline[result.name]['p50'] > 0:
+            ratio = result.p50 / baseline[result.name]['p50']
+            comparison[result.name] = (ratio, ratio > 1 + threshold)
+    return comparison
+
+
+def format_result(result, comparison=None):
+    line = '{:<40} {:>6} {:>10.4g} {:>10.4g} {:>10.4g} {:>10.1f} {:>10.2f}'.format(
+        result.name, result.iterations, result.mean * 1000, result.p50 * 1000, result.p95 * 1000,
+        result.throughput, result.peak_memory / 1024 / 1024)
+    if comparison and result.name in comparison:
+        ratio, regressed = comparison[result.name]
+        line += ' {:>+8.1%}{}'.format(ratio - 1, ' REGRESSION' if regressed else '')
+    return line
+
+
+def format_header(with_baseline=False):
+    header = '{:<40} {:>6} {:>10} {:>10} {:>10} {:>10} {:>10}'.format('case', 'iters', 'mean(ms)', 'p50(ms)',
+                                                                      'p95(ms)', 'ops/s', 'peak(MB)')
+    return header + (' {:>8}'.format('vs base') if with_baseline else '')
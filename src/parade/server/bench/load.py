@@ -0,0 +1,498 @@
+# -*- coding:utf-8 -*-
+"""
+Load testing of the dashboards with simulated concurrent users.
+
+Every virtual user replays the traffic of a browser session: the layout fetch
+(the dash app layout, the callback graph and the cached dashboard layout),
+the initial callbacks of the subscribed components, then a series of
+interactions which change a random filter to a random value (taken from the
+filter options in the layout) and fire the callbacks of the components
+subscribing the filter, as defined by the ``subscribes`` of the dashboard
+config. The callbacks are fired in the shape the server registered them,
+as listed in the callback graph: the partially updated components send back
+their render version, and the background components submit the job and
+poll it until done, their latency is measured from the submit to the result.
+
+The users are ramped in stages, the latencies are measured per component and
+the saturation point is the first stage where the throughput stops growing,
+the p95 latency exceeds the SLO or the requests start failing. Without a
+target url, the load is put on a local server of the synthetic workspace
+started in a separate process::
+
+    parade loadtest --users 1,2,4,8,16 --stage-duration 30
+    parade loadtest --url http://localhost:5000 --workspace . --users 1,2,4,8
+"""
+import gzip
+import hashlib
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, build_opener, HTTPCookieProcessor
+
+from ..dash.layout import LAYOUT_ROUTE
+
+DEFAULT_USERS = (1, 2, 4, 8, 16)
+"""Default concurrent users of the stages."""
+
+DEFAULT_STAGE_DURATION = 30
+"""Default duration (seconds) of every stage."""
+
+DEFAULT_THINK_TIME = 1.0
+"""Default mean think time (seconds) between the interactions of a user."""
+
+DEFAULT_INTERACTIONS = 5
+"""Default filter interactions of a user session before reloading the dashboard."""
+
+DEFAULT_MIN_GAIN = 0.1
+"""The least relative throughput gain of a stage to be not saturated."""
+
+DEFAULT_MAX_ERROR_RATE = 0.01
+"""The highest error rate of a stage to be not saturated."""
+
+DASH_PREFIX = '/dashboard/'
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return float('nan')
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def load_dashboard_configs(workspace):
+    """
+    load the dashboard configs of the workspace
+    :param workspace: the workspace directory
+    :return: the dict [dashboard name => config dict]
+    """
+    import yaml
+    configs = {}
+    dash_dir = os.path.join(workspace, 'dashboard')
+    for dash_config in sorted(os.listdir(dash_dir)) if os.path.exists(dash_dir) else []:
+        if not os.path.isfile(os.path.join(dash_dir, dash_config)):
+            continue
+        with open(os.path.join(dash_dir, dash_config)) as f:
+            config_dict = yaml.safe_load(f)
+        if config_dict:
+            configs[os.path.splitext(dash_config)[0]] = config_dict
+    return configs
+
+
+def _find_components(layout, found=None):
+    """collect the props of the components with id in the serialized layout"""
+    found = {} if found is None else found
+    if isinstance(layout, dict):
+        props = layout.get('props')
+        if isinstance(props, dict):
+            if isinstance(props.get('id'), str):
+                found[props['id']] = props
+            _find_components(props.get('children'), found)
+        else:
+            for value in layout.values():
+                _find_components(value, found)
+    elif isinstance(layout, list):
+        for item in layout:
+            _find_components(item, found)
+    return found
+
+
+def _random_value(props, prop, rng):
+    options = props.get('options')
+    if prop == 'value' and options:
+        values = [option['value'] if isinstance(option, dict) else option for option in options]
+        if props.get('multi'):
+            return rng.sample(values, rng.randint(1, len(values)))
+        return rng.choice(values)
+    if prop in ('start_date', 'end_date', 'date') and props.get('min_date_allowed') and props.get('max_date_allowed'):
+        import pandas as pd
+        start, end = pd.Timestamp(props['min_date_allowed']), pd.Timestamp(props['max_date_allowed'])
+        return (start + (end - start) * rng.random()).strftime('%Y-%m-%d')
+    if prop == 'value' and 'min' in props and 'max' in props:
+        return rng.uniform(props['min'], props['max'])
+    return props.get(prop)
+
+
+def _output_items(output):
+    """get the (component id, property) of the callback output spec, `id.prop` or `..id1.prop1...id2.prop2..`"""
+    outputs = output[2:-2].split('...') if output.startswith('..') and output.endswith('..') else [output]
+    return [tuple(item.rsplit('.', 1)) for item in outputs]
+
+
+def _response_values(content):
+    """get the updated [(component id, property) => value] of the callback response"""
+    try:
+        response = json.loads(content)['response']
+    except (TypeError, ValueError, KeyError):
+        return {}
+    return {(component_id, prop): value for component_id, props in response.items() for prop, value in props.items()}
+
+
+def _is_error(children):
+    return isinstance(children, dict) and (children.get('props') or {}).get('className') == 'parade-error'
+
+
+class DashboardScenario(object):
+    """The callbacks of a dashboard derived from the `subscribes` of its config."""
+
+    def __init__(self, name, config):
+        self.name = name
+        self.callbacks = {}
+        for output_key, inputs in (config.get('subscribes') or {}).items():
+            if not inputs or 'output_key' not in inputs[0]:
+                continue
+            self.callbacks[output_key] = (inputs[0]['output_key'],
+                                          [(item['key'], item['input_key']) for item in inputs[1:]])
+
+    def component_id(self, comp_key):
+        return self.name + '_' + comp_key
+
+    @property
+    def filters(self):
+        return sorted({key for _, inputs in self.callbacks.values() for key, _ in inputs})
+
+    def subscribers(self, filter_key):
+        return [output_key for output_key, (_, inputs) in self.callbacks.items()
+                if filter_key in [key for key, _ in inputs]]
+
+    def callback_spec(self, output_key, specs=None):
+        """
+        get the callback of the subscribed component, as registered by the server
+        :param output_key: the subscribed component key
+        :param specs: the callback graph of the server [output spec => callback spec], None if not fetched
+        :return: the callback spec in the format of `_dash-dependencies`, the submit of the job for
+        the background components
+        """
+        output_property, inputs = self.callbacks[output_key]
+        output_id = self.component_id(output_key)
+        for output in (output_id + '-job.data', '..{0}.{1}...{0}-rendered.data..'.format(output_id, output_property),
+                       output_id + '.' + output_property):
+            if specs and output in specs:
+                return specs[output]
+        return {'output': output_id + '.' + output_property,
+                'inputs': [{'id': self.component_id(key), 'property': prop} for key, prop in inputs],
+                'state': [{'id': self.component_id('page-id'), 'property': 'children'}]}
+
+    def poll_spec(self, output_key, specs):
+        """
+        get the callback polling the job of the background component
+        :return: the callback spec, None if the component is not in background
+        """
+        output_property, _ = self.callbacks[output_key]
+        output_id = self.component_id(output_key)
+        return (specs or {}).get('..{0}.{1}...{0}-poll.disabled...{0}-progress.children..'.format(output_id,
+                                                                                                  output_property))
+
+    @staticmethod
+    def callback_body(spec, values, changed=None):
+        """
+        get the request body of the callback
+        :param spec: the callback spec
+        :param values: the property values of the page [(component id, property) => value]
+        :param changed: the changed (component id, property) of the inputs, the first input by default
+        :return: the body of `_dash-update-component`
+        """
+        outputs = [{'id': component_id, 'property': prop} for component_id, prop in _output_items(spec['output'])]
+        changed = changed or [(item['id'], item['property']) for item in spec['inputs'][:1]]
+        return {
+            'output': spec['output'],
+            'outputs': outputs if len(outputs) > 1 else outputs[0],
+            'inputs': [dict(item, value=values.get((item['id'], item['property']))) for item in spec['inputs']],
+            'changedPropIds': [component_id + '.' + prop for component_id, prop in changed],
+            'state': [dict(item, value=values.get((item['id'], item['property']))) for item in spec['state']],
+        }
+
+
+class LoadStats(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, label, elapsed, ok):
+        with self._lock:
+            self.latencies[label].append(elapsed)
+            if not ok:
+                self.errors[label] += 1
+
+    @property
+    def requests(self):
+        return sum(len(latencies) for latencies in self.latencies.values())
+
+    @property
+    def error_count(self):
+        return sum(self.errors.values())
+
+    def all_latencies(self):
+        return [elapsed for latencies in self.latencies.values() for elapsed in latencies]
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, url, scenarios, stats, stop, credentials=None, think_time=DEFAULT_THINK_TIME,
+                 interactions=DEFAULT_INTERACTIONS, seed=None):
+        threading.Thread.__init__(self, daemon=True)
+        self.url = url.rstrip('/')
+        self.scenarios = scenarios
+        self.stats = stats
+        self.stop = stop
+        self.credentials = credentials
+        self.think_time = think_time
+        self.interactions = interactions
+        self.rng = random.Random(seed)
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()))
+        self.http_cache = {}
+
+    def request(self, label, path, body=None, headers=None):
+        data = json.dumps(body).encode() if body is not None else None
+        headers = dict(headers or {}, **{'Content-Type': 'application/json', 'Accept-Encoding': 'gzip'})
+        if data is None and path in self.http_cache:
+            # revalidate the cached response like a browser
+            headers['If-None-Match'] = self.http_cache[path][0]
+        req = Request(self.url + path, data=data, method='POST' if data is not None else 'GET', headers=headers)
+        start = time.perf_counter()
+        ok, content = False, None
+        try:
+            with self.opener.open(req, timeout=120) as response:
+                content = response.read()
+                if response.headers.get('Content-Encoding') == 'gzip':
+                    content = gzip.decompress(content)
+                ok = response.status < 400
+                if data is None and response.headers.get('ETag'):
+                    self.http_cache[path] = (response.headers['ETag'], content)
+        except HTTPError as e:
+            if e.code == 304 and path in self.http_cache:
+                ok, content = True, self.http_cache[path][1]
+        except (URLError, socket.timeout, ConnectionError):
+            pass
+        if not self.stop.is_set():
+            self.stats.record(label, time.perf_counter() - start, ok)
+        return content if ok else None
+
+    def login(self):
+        username, password = self.credentials
+        self.opener.open(Request(self.url + '/auth/login?username={}&password={}'.format(username, password),
+                                 data=b'', method='POST'), timeout=30).read()
+
+    def think(self):
+        self.stop.wait(self.rng.expovariate(1.0 / self.think_time) if self.think_time > 0 else 0)
+
+    def update_component(self, label, spec, values, changed=None):
+        """
+        fire the callback and keep the updated values of the page
+        :return: the updated values of the response, None if failed
+        """
+        content = self.request(label, DASH_PREFIX + '_dash-update-component',
+                               DashboardScenario.callback_body(spec, values, changed))
+        if content is None:
+            return None
+        updated = _response_values(content)
+        values.update((item, value) for item, value in updated.items() if item in values)
+        return updated
+
+    def fire(self, scenario, output_key, values, specs=None, changed=None):
+        label = scenario.name + '.' + output_key
+        poll = scenario.poll_spec(output_key, specs)
+        if poll is None:
+            self.update_component(label, scenario.callback_spec(output_key, specs), values, changed)
+            return
+
+        # the background component, measured from the submit of the job to the result
+        start = time.perf_counter()
+        ok = self.update_component(label + '.submit', scenario.callback_spec(output_key, specs), values,
+                                   changed) is not None
+        # the inputs of the poll, the n_intervals of the interval and the data of the job
+        poll_item, job_item = [(item['id'], item['property']) for item in poll['inputs']]
+        interval = (values.get((poll_item[0], 'interval')) or 1000) / 1000.0
+        # polled at once with the submitted job, then at every interval until disabled
+        changed = [job_item]
+        while ok:
+            updated = self.update_component(label + '.poll', poll, values, changed)
+            # the poll without a job is prevented with no content
+            ok = bool(updated)
+            if ok and updated.get((poll_item[0], 'disabled')):
+                ok = not _is_error(updated.get(_output_items(poll['output'])[0]))
+                break
+            if self.stop.wait(interval):
+                break
+            values[poll_item] = (values.get(poll_item) or 0) + 1
+            changed = [poll_item]
+        if not self.stop.is_set():
+            self.stats.record(label, time.perf_counter() - start, ok)
+
+    def session(self, scenario):
+        self.request('layout', DASH_PREFIX + '_dash-layout')
+        # the callback graph scoped to the dashboard of the page
+        dependencies = self.request('dependencies', DASH_PREFIX + '_dash-dependencies',
+                                    headers={'Referer': self.url + DASH_PREFIX + scenario.name})
+        specs = {spec['output']: spec for spec in json.loads(dependencies)} if dependencies else None
+        content = self.request('content', DASH_PREFIX + LAYOUT_ROUTE + scenario.name)
+        components = _find_components(json.loads(content)) if content else {}
+
+        def props(key):
+            return components.get(scenario.component_id(key), {})
+
+        # the values of the inputs and states of the callbacks, the polling interval of the background jobs
+        values = {}
+        for output_key in scenario.callbacks:
+            poll = scenario.poll_spec(output_key, specs)
+            for spec in [scenario.callback_spec(output_key, specs)] + ([poll] if poll else []):
+                for item in spec['inputs'] + spec['state']:
+                    values[(item['id'], item['property'])] = components.get(item['id'], {}).get(item['property'])
+            if poll:
+                poll_id = poll['inputs'][0]['id']
+                values[(poll_id, 'interval')] = components.get(poll_id, {}).get('interval')
+        # the page id generated by the browser with the layout, the callbacks are superseded per page
+        values[(scenario.component_id('page-id'), 'children')] = uuid.uuid4().hex
+
+        for output_key in scenario.callbacks:
+            if self.stop.is_set():
+                return
+            self.fire(scenario, output_key, values, specs)
+
+        filters = scenario.filters
+        for _ in range(self.interactions if filters else 0):
+            self.think()
+            if self.stop.is_set():
+                return
+            filter_key = self.rng.choice(filters)
+            filter_id = scenario.component_id(filter_key)
+            for component_id, prop in list(values):
+                if component_id == filter_id:
+                    values[(component_id, prop)] = _random_value(props(filter_key), prop, self.rng)
+            for output_key in scenario.subscribers(filter_key):
+                changed = [(filter_id, prop) for key, prop in scenario.callbacks[output_key][1] if key == filter_key]
+                self.fire(scenario, output_key, values, specs, changed)
+
+    def run(self):
+        try:
+            if self.credentials:
+                self.login()
+        except (HTTPError, URLError, socket.timeout, ConnectionError):
+            self.stats.record('login', 0, False)
+            return
+        while not self.stop.is_set():
+            self.session(self.rng.choice(self.scenarios))
+            self.think()
+
+
+class StageResult(object):
+    def __init__(self, users, duration, stats):
+        self.users = users
+        self.duration = duration
+        self.stats = stats
+
+    @property
+    def throughput(self):
+        return self.stats.requests / self.duration
+
+    @property
+    def error_rate(self):
+        return self.stats.error_count / self.stats.requests if self.stats.requests else 0
+
+    def latency(self, pct, label=None):
+        return percentile(self.stats.latencies[label] if label else self.stats.all_latencies(), pct)
+
+
+def run_stage(url, scenarios, users, duration, **kwargs):
+    """
+    run the stage of concurrent users
+    :param url: the base url of the server
+    :param scenarios: the dashboard scenarios
+    :param users: the number of concurrent users
+    :param duration: the duration (seconds) of the stage
+    :param kwargs: the arguments of the virtual users
+    :return: the stage result
+    """
+    stats = LoadStats()
+    stop = threading.Event()
+    threads = [VirtualUser(url, scenarios, stats, stop, seed=idx, **kwargs) for idx in range(users)]
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=120)
+    return StageResult(users, duration, stats)
+
+
+def find_saturation(stages, slo=None, min_gain=DEFAULT_MIN_GAIN, max_error_rate=DEFAULT_MAX_ERROR_RATE):
+    """
+    find the first saturated stage
+    :param stages: the stage results in the ascending order of users
+    :param slo: the p95 latency (seconds) objective
+    :param min_gain: the least relative throughput gain over the previous stage
+    :param max_error_rate: the highest error rate
+    :return: the tuple of the saturated stage and the reason, or (None, None) if not saturated
+    """
+    for idx, stage in enumerate(stages):
+        if stage.error_rate > max_error_rate:
+            return stage, 'error rate {:.1%}'.format(stage.error_rate)
+        if slo and stage.latency(95) > slo:
+            return stage, 'p95 latency {:.3f}s over the SLO'.format(stage.latency(95))
+        if idx > 0 and stage.throughput < stages[idx - 1].throughput * (1 + min_gain):
+            return stage, 'throughput {:.1f} req/s not growing'.format(stage.throughput)
+    return None, None
+
+
+def format_stage(stage):
+    lines = ['users={:<4} requests={:<7} throughput={:.1f} req/s errors={:.1%} p50={:.3f}s p95={:.3f}s p99={:.3f}s'
+             .format(stage.users, stage.stats.requests, stage.throughput, stage.error_rate, stage.latency(50),
+                     stage.latency(95), stage.latency(99))]
+    for label in sorted(stage.stats.latencies):
+        lines.append('    {:<40} n={:<6} p50={:.3f}s p95={:.3f}s p99={:.3f}s errors={}'.format(
+            label, len(stage.stats.latencies[label]), stage.latency(50, label), stage.latency(95, label),
+            stage.latency(99, label), stage.stats.errors[label]))
+    return '\n'.join(lines)
+
+
+def serve_synthetic(port, rows, cols, ready=None):
+    """
+    serve the dashboards of the synthetic workspace, run in a separate process of the load generator
+    :param port: the port to listen on
+    :param rows: the rows of the generated frames
+    :param cols: the numeric columns of the generated frames
+    :param ready: the event set when the server is listening
+    """
+    import logging
+    import yaml
+    from werkzeug.serving import make_server
+    from .workspace import SyntheticContext, make_dashboard_config
+    from .. import create_webapp
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    # the slow callbacks are expected under load
+    logging.getLogger('Parade.Dash').setLevel(logging.ERROR)
+    with SyntheticContext(rows=rows, cols=cols) as context:
+        with open(os.path.join('dashboard', 'synthetic.yml'), 'w') as f:
+            yaml.safe_dump(make_dashboard_config(), f)
+        app = create_webapp(context, enable_auth=True, enable_dash=True, enable_socketio=False)
+        server = make_server('127.0.0.1', port, app, threaded=True)
+        if ready is not None:
+            ready.set()
+        server.serve_forever()
+
+
+def synthetic_credentials():
+    return 'parade', hashlib.md5('parade'.encode(encoding='utf-8')).hexdigest()
+
+
+def start_synthetic_server(rows, cols):
+    """
+    start the server of the synthetic workspace in a separate process
+    :return: the tuple of the server process and the base url
+    """
+    import multiprocessing
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=serve_synthetic, args=(port, rows, cols, ready), daemon=True)
+    process.start()
+    assert ready.wait(120), 'the synthetic server failed to start'
+    return process, 'http://127.0.0.1:{}'.format(port)
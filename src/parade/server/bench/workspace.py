@@ -0,0 +1,177 @@
+# -*- coding:utf-8 -*-
+"""
+A synthetic parade workspace for the benchmarks and the load tests.
+
+The workspace lives in a temporary directory and provides fake tasks which
+return generated DataFrames of configurable shape, so the server code paths
+can be exercised without a real workspace, connection or data.
+"""
+import os
+import shutil
+import tempfile
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from parade.config import ConfigEntry
+
+DEFAULT_ROWS = 10000
+"""Default rows of the generated frames."""
+
+DEFAULT_COLS = 5
+"""Default numeric columns of the generated frames."""
+
+CATEGORIES = ['cat-{:02d}'.format(i) for i in range(20)]
+"""The categories of the generated frames."""
+
+
+def make_frame(rows=DEFAULT_ROWS, cols=DEFAULT_COLS, seed=0):
+    """
+    generate a frame with a time key, a category and the numeric value columns
+    :param rows: the rows of the frame
+    :param cols: the numeric columns of the frame
+    :param seed: the random seed
+    :return: the frame with columns `(key, category, v0, ..., v{cols-1})`
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'key': pd.date_range('2020-01-01', periods=rows, freq='min'),
+        'category': np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), rows)],
+    })
+    values = rng.normal(100, 25, (rows, cols)).cumsum(axis=0)
+    for idx in range(cols):
+        df['v{}'.format(idx)] = values[:, idx]
+    return df
+
+
+def make_gantt_frame(rows=DEFAULT_ROWS, seed=0):
+    """
+    generate the tasks and milestones of the gantt chart
+    :param rows: the number of tasks
+    :param seed: the random seed
+    :return: the frame with columns `(category, label, start, end, progress, issue_type, sub_count, warn, link)`
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D')
+    end = start + pd.to_timedelta(rng.integers(0, 60, rows), unit='D')
+    milestone = rng.random(rows) < 0.1
+    return pd.DataFrame({
+        'category': np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), rows)],
+        'label': ['task-{}'.format(i) for i in range(rows)],
+        'start': start.strftime('%Y-%m-%d').where(~milestone, None),
+        'end': end.strftime('%Y-%m-%d'),
+        'progress': rng.random(rows).round(2),
+        'issue_type': np.where(milestone, 'Milestone', 'Task'),
+        'sub_count': np.where(rng.random(rows) < 0.1, rng.integers(1, 10, rows), 0),
+        'warn': np.where(rng.random(rows) < 0.05, 'late', None),
+        'link': None,
+    })
+
+
+def make_geojson(regions=len(CATEGORIES), key='name'):
+    """
+    generate the square regions of a grid as GeoJSON features
+    :param regions: the number of regions
+    :param key: the property to identify the regions
+    :return: the GeoJSON feature collection, with regions identified as the `CATEGORIES`
+    """
+    features = []
+    width = int(np.ceil(np.sqrt(regions)))
+    for idx in range(regions):
+        x, y = idx % width, idx // width
+        features.append({
+            'type': 'Feature',
+            'properties': {key: CATEGORIES[idx % len(CATEGORIES)]},
+            'geometry': {'type': 'Polygon',
+                         'coordinates': [[[x, y], [x + 1, y], [x + 1, y + 1], [x, y + 1], [x, y]]]},
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+class SyntheticTask(object):
+    """A fake etl task returning the generated frame."""
+
+    def __init__(self, name, generator, **kwargs):
+        self.name = name
+        self.generator = generator
+        self.kwargs = kwargs
+
+    @property
+    def attributes(self):
+        return {'name': self.name}
+
+    @property
+    def info(self):
+        return dict(self.attributes, **self.kwargs)
+
+    def execute_internal(self, context, **kwargs):
+        # the same arguments always generate the same frame
+        seed = zlib.crc32(repr(sorted((k, str(v)) for k, v in kwargs.items())).encode())
+        return self.generator(seed=seed, **self.kwargs)
+
+
+class SyntheticContext(object):
+    """
+    The parade context of the synthetic workspace, the workspace directory is
+    created on enter and removed on exit, and is the working directory in between.
+    """
+
+    def __init__(self, rows=DEFAULT_ROWS, cols=DEFAULT_COLS, conf=None):
+        self.name = 'parade_synthetic'
+        self.rows = rows
+        self.cols = cols
+        self.conf = ConfigEntry(conf or {})
+        self.workdir = None
+        self._cwd = None
+        self.tasks = {
+            'frame': SyntheticTask('frame', make_frame, rows=rows, cols=cols),
+            'small': SyntheticTask('small', make_frame, rows=min(rows, 100), cols=cols),
+            'gantt': SyntheticTask('gantt', make_gantt_frame, rows=min(rows, 1000)),
+            'options': SyntheticTask('options', lambda seed: [{'label': c, 'value': c} for c in CATEGORIES]),
+        }
+
+    def get_task(self, name, task_class=None):
+        return self.tasks[name]
+
+    def load_query(self, query, conn=None, **kwargs):
+        return self.tasks['frame'].execute_internal(self, query=query, **kwargs)
+
+    def __enter__(self):
+        self.workdir = tempfile.mkdtemp(prefix='parade-synthetic-')
+        os.makedirs(os.path.join(self.workdir, 'dashboard'))
+        self._cwd = os.getcwd()
+        os.chdir(self.workdir)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        os.chdir(self._cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def make_dashboard_config(charts=4):
+    """
+    generate the config of a dashboard with a category filter subscribed by the charts and a table
+    :param charts: the number of charts
+    :return: the dashboard config dict
+    """
+    components = {
+        'category': {'type': 'filter', 'subType': 'selector', 'task': 'options', 'title': 'category'},
+        'table': {'type': 'table', 'title': 'table', 'task': 'small', 'args': {'page_size': 20}},
+    }
+    subscribes = {}
+    columns = [{'width': 'w1', 'type': 'component', 'component': 'category'}]
+    for idx in range(charts):
+        chart_key = 'chart{}'.format(idx)
+        components[chart_key] = {'type': 'chart', 'subType': ('scatter', 'bar')[idx % 2], 'title': chart_key,
+                                 'task': 'frame', 'cache': 'true', 'args': {'key': 'key', 'max_points': 1000}}
+        subscribes[chart_key] = [{'output_key': 'children'},
+                                 {'key': 'category', 'input_key': 'value', 'as': 'category'}]
+        columns.append({'width': 'w4', 'type': 'component', 'component': chart_key})
+    columns.append({'width': 'w1', 'type': 'component', 'component': 'table'})
+    return {
+        'displayName': 'Synthetic',
+        'components': components,
+        'subscribes': subscribes,
+        'layout': [{'columns': columns}],
+    }
@@ -0,0 +1,138 @@
+# -*- coding:utf-8 -*-
+"""
+Cooperative cancellation of the work running for a request.
+
+The work checks the cancel token active in its thread at the checkpoints
+(see ``check``), and the queries executed on the pooled sqlalchemy engines
+are cancelled on the database as soon as the token is cancelled, if the
+database driver supports it (``cursor.cancel()``, ``connection.cancel()``
+or ``connection.interrupt()``, e.g. psycopg2, cx_Oracle, pyodbc and
+sqlite3). The query of a driver without the support runs to the end and is
+then discarded at the next checkpoint.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger('Parade.Server')
+
+_local = threading.local()
+
+
+class Cancelled(Exception):
+    """The work of a cancelled token is interrupted."""
+
+
+class CancelToken(object):
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._hooks = {}
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """
+        cancel the token and interrupt the running queries of the token
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            hooks = list(self._hooks.values())
+        for hook in hooks:
+            try:
+                hook()
+            except Exception:
+                logger.debug('failed to cancel the running query', exc_info=True)
+
+    def wait(self, seconds):
+        """
+        wait for the cancellation
+        :param seconds: the seconds to wait
+        :return: True if cancelled in the seconds
+        """
+        return self._event.wait(seconds)
+
+    def add_hook(self, key, hook):
+        with self._lock:
+            self._hooks[key] = hook
+
+    def remove_hook(self, key):
+        with self._lock:
+            self._hooks.pop(key, None)
+
+
+@contextmanager
+def activate(token):
+    """
+    activate the token in the current thread
+    :param token: the cancel token
+    """
+    previous = getattr(_local, 'token', None)
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+def current_token():
+    return getattr(_local, 'token', None)
+
+
+def check():
+    """
+    raise `Cancelled` if the token active in the current thread is cancelled
+    """
+    token = current_token()
+    if token is not None and token.cancelled:
+        raise Cancelled()
+
+
+def _cancel_hook(conn, cursor):
+    if callable(getattr(cursor, 'cancel', None)):
+        return cursor.cancel
+    fairy = conn.connection
+    dbapi_connection = getattr(fairy, 'dbapi_connection', None) or getattr(fairy, 'connection', None)
+    for method in ('cancel', 'interrupt'):
+        if callable(getattr(dbapi_connection, method, None)):
+            return getattr(dbapi_connection, method)
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    token = current_token()
+    if token is None:
+        return
+    check()
+    hook = _cancel_hook(conn, cursor)
+    if hook is not None:
+        token.add_hook(id(cursor), hook)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    token = current_token()
+    if token is not None:
+        token.remove_hook(id(cursor))
+
+
+def _handle_error(exception_context):
+    token = current_token()
+    if token is not None and exception_context.cursor is not None:
+        token.remove_hook(id(exception_context.cursor))
+
+
+def instrument_engine(engine):
+    """
+    cancel the queries of the engine with the token active in the executing thread
+    :param engine: the sqlalchemy engine
+    """
+    from sqlalchemy import event
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
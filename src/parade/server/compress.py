@@ -0,0 +1,108 @@
+# -*- coding:utf-8 -*-
+"""
+Response compression of the parade server.
+
+The compression applies to every response of the flask app, which includes
+the parade api blueprint and the dash server mounted on the same app. It is
+configured with the ``compress`` section of the workspace config:
+
+    compress:
+      enable: true
+      minSize: 1024
+      level: 6
+      mimetypes: [application/json, text/html, ...]
+
+Brotli is preferred when the *brotli* package is installed and accepted by
+the client, otherwise gzip is used. Streamed responses are never compressed.
+"""
+import gzip
+
+DEFAULT_MIN_SIZE = 1024
+"""Responses smaller than this size (bytes) are sent uncompressed."""
+
+DEFAULT_LEVEL = 6
+"""Default compression level."""
+
+DEFAULT_MIMETYPES = [
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+]
+"""Default content types to compress."""
+
+
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def _accepted_encodings(request):
+    accepted = request.accept_encodings
+    encodings = []
+    if accepted['br'] and _brotli():
+        encodings.append('br')
+    if accepted['gzip']:
+        encodings.append('gzip')
+    return encodings
+
+
+def compress_body(body, encoding, level=DEFAULT_LEVEL):
+    """
+    compress the response body with the encoding
+    :param body: the response body in bytes
+    :param encoding: the content encoding, `br` or `gzip`
+    :param level: the compression level in gzip scale (1-9)
+    :return: the compressed body
+    """
+    if encoding == 'br':
+        # map the gzip level onto the brotli quality (0-11)
+        return _brotli().compress(body, quality=min(11, level + 2))
+    return gzip.compress(body, compresslevel=level)
+
+
+def init_compress(app, context):
+    """
+    register the response compression to the flask app
+    :param app: the flask app
+    :param context: the parade context
+    """
+    if not context.conf.get_or_else('compress.enable', True):
+        return
+
+    from flask import request
+
+    min_size = int(context.conf.get_or_else('compress.minSize', DEFAULT_MIN_SIZE))
+    level = int(context.conf.get_or_else('compress.level', DEFAULT_LEVEL))
+    mimetypes = set(context.conf.get_or_else('compress.mimetypes', DEFAULT_MIMETYPES))
+
+    @app.after_request
+    def compress_response(response):
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        if response.status_code < 200 or response.status_code >= 300 or response.status_code == 206:
+            return response
+        if response.mimetype not in mimetypes or 'Content-Encoding' in response.headers:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encodings = _accepted_encodings(request)
+        if not encodings:
+            return response
+
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+
+        response.set_data(compress_body(body, encodings[0], level))
+        response.headers['Content-Encoding'] = encodings[0]
+        # the etag of the uncompressed body is no longer a strong validator
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -1,16 +1,22 @@
-from importlib import import_module
-
 import dash
 import dash_html_components as html
 import dash_core_components as dcc
 import dash_table
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
 from flask_caching import Cache
 from flask_login import current_user
 import uuid
 
 from parade.core.context import Context
 from parade.server.dash.utils import min_graph
+from .instrument import ComponentTimer
+from .dataset import DatasetRegistry
+from .patch import RenderHistory, patch_supported
+from .store import ServerStore, is_handle
+from .supersede import Supersession, debounce_of
+from .. import cancel
+from ..tracing import span
 
 
 class Dashboard(object):
@@ -18,6 +24,8 @@ class Dashboard(object):
     def __init__(self, app: dash.Dash, context: Context, **kwargs):
         self.app = app
         self.context = context
+        # the ids of the components updated by the callbacks of the dashboard
+        self.callback_outputs = set()
 
         self.cache = Cache(app.server, config={
             # Note that filesystem cache doesn't work on systems with ephemeral
@@ -54,6 +62,15 @@ class Dashboard(object):
         """
         return html.Div([html.H1('Content of dashboard [' + self.name + ']')])
 
+    @property
+    def static_layout(self):
+        """
+        get the session-independent part of the dashboard layout, which is serialized once and
+        served with http caching
+        :return: the static dash-layout segment of the dashboard
+        """
+        return self.layout
+
 
 class DashboardComponent(object):
     def __init__(self, context):
@@ -84,14 +101,37 @@ class ConfigurableDashboard(Dashboard):
     widgets.
     """
 
+    RESAMPLE_CACHE_TIMEOUT = 600
+    """Seconds to keep the full-resolution data of the charts resampled on zoom."""
+
     def __init__(self, app: dash.Dash, context: Context, **kwargs):
         Dashboard.__init__(self, app, context)
         self.config_name = kwargs.get('config_name', None)
         self.config_dict = kwargs.get('config', None)
         if not self.config_dict:
             self.config_dict = self.load_config()
+        self.converters = self.init_component_converters()
+        self.pushdowns = self.init_component_pushdowns()
+        self.datasets = kwargs.get('datasets') or \
+            DatasetRegistry(context, timeout=context.conf.get_or_else('dash.dataset.timeout', 10))
+        self.init_component_datasets()
+        self.warmups = self.init_component_warmups()
+        self.supersession = Supersession(self.name)
+        self.background_jobs = None
+        if any(self._is_background(comp_key) for comp_key in self.config_dict.get('components', {})):
+            from .background import BackgroundJobs
+            self.background_jobs = BackgroundJobs(
+                self.name, self.cache, workers=context.conf.get_or_else('dash.background.workers', 4),
+                timeout=context.conf.get_or_else('dash.background.timeout', 600))
+        self.render_history = None
+        if patch_supported() and context.conf.get_or_else('dash.patch.enabled', True):
+            self.render_history = RenderHistory(max_entries=context.conf.get_or_else('dash.patch.maxEntries', 256))
+        self.server_store = ServerStore(self.cache,
+                                        max_entries=context.conf.get_or_else('dash.serverStore.maxEntries', 64),
+                                        timeout=context.conf.get_or_else('dash.serverStore.timeout', 600))
         self.parsed_layout = self.parse_layout()
         self.init_component_subscription()
+        self.init_chart_resampling()
 
     @property
     def name(self):
@@ -116,6 +156,55 @@ class ConfigurableDashboard(Dashboard):
         """
         raise NotImplementedError("The target is required")
 
+    def init_component_converters(self):
+        """
+        resolve and validate the converters of all components
+        :return: the converter dict [comp_key => converter]
+        """
+        from .convert import load_converter
+        converters = {}
+        for comp_key, comp in self.config_dict.get('components', {}).items():
+            if 'convert' in comp:
+                converters[comp_key] = load_converter(self.context, comp['convert'])
+        return converters
+
+    def init_component_pushdowns(self):
+        """
+        compile and validate the query pushdowns of all query-backed components
+        :return: the pushdown dict [comp_key => pushdown]
+        """
+        from .pushdown import QueryPushdown
+        pushdowns = {}
+        for comp_key, comp in self.config_dict.get('components', {}).items():
+            if comp.get('pushdown'):
+                assert 'query' in comp and 'conn' in comp, 'pushdown requires the query and conn of ' + comp_key
+                pushdowns[comp_key] = QueryPushdown(comp['pushdown'])
+        return pushdowns
+
+    def init_component_datasets(self):
+        """
+        register the datasets of the dashboard and validate the datasets referenced by the components
+        """
+        for name, spec in self.config_dict.get('datasets', {}).items():
+            self.datasets.register(name, spec, dashboard=self.name)
+        for comp_key, comp in self.config_dict.get('components', {}).items():
+            if 'dataset' in comp:
+                assert self.datasets.resolve(comp['dataset'], self.name) is not None, \
+                    'dataset [' + comp['dataset'] + '] of ' + comp_key + ' is not defined'
+
+    def init_component_warmups(self):
+        """
+        parse and validate the cache warming jobs of the subscribed components
+        :return: the list of warmup jobs
+        """
+        from .warmup import WarmupJob
+        subscribes = self.config_dict.get('subscribes') or {}
+        jobs = [WarmupJob(spec) for spec in self.config_dict.get('warmup') or []]
+        for job in jobs:
+            for comp_key in job.components or []:
+                assert comp_key in subscribes, 'the warmed component ' + comp_key + ' is not subscribed'
+        return jobs
+
     def parse_layout(self):
         layout = []
         if 'components' in self.config_dict:
@@ -123,8 +212,10 @@ class ConfigurableDashboard(Dashboard):
                 if comp['type'] == 'store':
                     store_id = self.name + '_' + comp_key
                     store_type = comp.get('subType', 'session')
-                    assert store_type in ('local', 'session', 'memory'), 'invalid store type'
-                    layout.append(dcc.Store(id=store_id, storage_type=store_type))
+                    assert store_type in ('local', 'session', 'memory', 'server'), 'invalid store type'
+                    # the server store only keeps the handle of the data in the browser
+                    layout.append(dcc.Store(id=store_id,
+                                            storage_type='memory' if store_type == 'server' else store_type))
         layout.extend(self.parse_rows(self.config_dict['layout']))
         return layout
 
@@ -186,21 +277,41 @@ class ConfigurableDashboard(Dashboard):
             component_id = self.name + '_' + comp_key
 
             comp_data = []
+            timer = ComponentTimer(self.name, comp_key)
             if auto_render:
-                comp_data = self._load_component_data(component)
-                if 'convert' in component:
-                    dash_mod = import_module(self.context.name + '.dashboard')
-                    output_processor = getattr(dash_mod, '_converter_' + component['convert'])
-                    comp_data = output_processor(comp_data)
+                with timer.phase('load'):
+                    comp_data = self._load_component_data(component, comp_key=comp_key)
+                timer.record_rows(comp_data)
+                if comp_key in self.converters:
+                    with timer.phase('convert'):
+                        comp_data = self.converters[comp_key](comp_data)
+                if self._is_resampled(component):
+                    self.cache.set(self._resample_cache_key(comp_key), comp_data, timeout=self.RESAMPLE_CACHE_TIMEOUT)
 
             assert component['type'] != 'store', 'the component to render cannot be of type store'
 
-            if component['type'] == 'filter':
-                return self._init_component_filter(component_id, component, comp_data)
-            if component['type'] == 'chart':
-                return loading_wrapper(component_id, self._init_component_chart(component_id, component, comp_data))
-            if component['type'] == 'table':
-                return loading_wrapper(component_id, self._init_component_table(component_id, component, comp_data))
+            with timer.phase('render'):
+                if component['type'] == 'filter':
+                    return self._init_component_filter(component_id, component, comp_data)
+                if component['type'] == 'chart':
+                    widget = loading_wrapper(component_id,
+                                             self._init_component_chart(component_id, component, comp_data))
+                elif component['type'] == 'table':
+                    widget = loading_wrapper(component_id,
+                                             self._init_component_table(component_id, component, comp_data))
+                else:
+                    widget = None
+                if widget is not None and self._is_background(comp_key):
+                    # the job of the component, polled until the result is rendered
+                    return [dcc.Store(id=component_id + '-job', storage_type='memory'),
+                            dcc.Interval(id=component_id + '-poll', disabled=True,
+                                         interval=self.context.conf.get_or_else('dash.background.interval', 1000)),
+                            html.Div(id=component_id + '-progress'), widget]
+                if widget is not None and self._is_patched(comp_key):
+                    # the render version of the children held by the browser
+                    return [dcc.Store(id=component_id + '-rendered', storage_type='memory'), widget]
+                if widget is not None:
+                    return widget
 
             return html.Div(id=component_id)
         return 'INVALID COMPONENT [' + comp_key + ']'
@@ -238,40 +349,216 @@ class ConfigurableDashboard(Dashboard):
                 output_property = inputs[0]['output_key']
                 # 原先的设计没有考虑到一个输入的input_item对应两个关键参数的情况，比如date_range的start_date和end_date
                 inputs = inputs[1:]
-                add_callback = self.app.callback(Output(output_id, output_property),
-                                                 [Input(self.name + '_' + input_item['key'],
-                                                        input_item['input_key'])
-                                                  for input_item in inputs])
-
+                self.callback_outputs.add(output_id)
+                callback_inputs = [Input(self.name + '_' + input_item['key'], input_item['input_key'])
+                                   for input_item in inputs]
                 input_as = [input_item['as'] for input_item in inputs]
+                # the callbacks are superseded per page, the page id is the last state of the callbacks
+                page_state = State(self.name + '_page-id', 'children')
                 # input as 是一个dict是相当于回调函数的参数，输出的值要作为output_key对应的
                 # component 的 data/value/children等
-                add_callback(self._render_component_func(output_key, input_as))
+                if self._is_background(output_key):
+                    job_id, poll_id, progress_id = output_id + '-job', output_id + '-poll', output_id + '-progress'
+                    self.callback_outputs.update([job_id, poll_id, progress_id])
+                    add_callback = self.app.callback(Output(job_id, 'data'), callback_inputs, [page_state])
+                    add_callback(self._submit_component_func(output_key, input_as))
+                    add_callback = self.app.callback([Output(output_id, output_property), Output(poll_id, 'disabled'),
+                                                      Output(progress_id, 'children')],
+                                                     [Input(poll_id, 'n_intervals'), Input(job_id, 'data')])
+                    add_callback(self._poll_component_func())
+                elif self._is_patched(output_key):
+                    version_id = output_id + '-rendered'
+                    self.callback_outputs.add(version_id)
+                    add_callback = self.app.callback([Output(output_id, output_property), Output(version_id, 'data')],
+                                                     callback_inputs, [page_state, State(version_id, 'data')])
+                    add_callback(self._patch_component_func(output_key, input_as))
+                else:
+                    add_callback = self.app.callback(Output(output_id, output_property), callback_inputs,
+                                                     [page_state])
+                    add_callback(self._render_component_func(output_key, input_as))
             else:
                 assert "未指定output_key"
 
-    def _load_component_data(self, comp, **kwargs):
-        if 'task' in comp:
-            data = self.context.get_task(comp['task']).execute_internal(self.context, **kwargs)
+    def init_chart_resampling(self):
+        """
+        re-render the downsampled charts with the data within the zoomed range, the charts with both
+        `max_points` and `resample_on_zoom` arguments are enabled
+        """
+        for comp_key, comp in self.config_dict.get('components', {}).items():
+            if self._is_resampled(comp):
+                graph_id = self.name + '_' + comp_key + '-graph'
+                self.callback_outputs.add(graph_id)
+                add_callback = self.app.callback(Output(graph_id, 'figure'), [Input(graph_id, 'relayoutData')])
+                add_callback(self._resample_chart_func(comp_key))
+
+    def _is_patched(self, comp_key):
+        """
+        whether the subscribed children of the component are updated partially, the charts resampled on
+        zoom are always re-rendered as their figures are also updated by the resampling
+        """
+        subscribes = self.config_dict.get('subscribes') or {}
+        if self.render_history is None or comp_key not in subscribes or self._is_background(comp_key):
+            return False
+        comp = self.config_dict['components'][comp_key]
+        return subscribes[comp_key][0].get('output_key') == 'children' and comp['type'] in ('chart', 'table') \
+            and not self._is_resampled(comp)
+
+    def _is_background(self, comp_key):
+        """
+        whether the subscribed component is loaded and rendered by the background jobs
+        """
+        comp = self.config_dict['components'][comp_key]
+        return comp_key in (self.config_dict.get('subscribes') or {}) and \
+            str(comp.get('background', False)).lower() == 'true'
+
+    @staticmethod
+    def _is_resampled(comp):
+        args = comp.get('args') or {}
+        return comp['type'] == 'chart' and bool(args.get('max_points')) and \
+            str(args.get('resample_on_zoom', False)).lower() == 'true'
+
+    def _resample_cache_key(self, comp_key, session_id=None):
+        return '-'.join(part for part in [self.name, session_id, comp_key, 'resample'] if part)
+
+    def _resample_chart_func(self, comp_key):
+        def resample_chart(relayout_data):
+            if not relayout_data:
+                raise PreventUpdate
+            if 'xaxis.range[0]' in relayout_data:
+                x_range = [relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']]
+            elif 'xaxis.range' in relayout_data:
+                x_range = relayout_data['xaxis.range']
+            elif relayout_data.get('xaxis.autorange'):
+                x_range = None
+            else:
+                raise PreventUpdate
+
+            # the subscribed charts keep the data per session, the auto-rendered ones share the same data
+            data = self.cache.get(self._resample_cache_key(comp_key, self._current_session_id()))
+            if data is None:
+                data = self.cache.get(self._resample_cache_key(comp_key))
+            if data is None:
+                raise PreventUpdate
+
+            chart = self.config_dict['components'][comp_key]
+            chart_main = self._load_chart_main(chart)
+            return chart_main.render_figure(data, **dict(chart['args'], x_range=x_range))
+
+        return resample_chart
+
+    @staticmethod
+    def _current_session_id():
+        from flask import has_request_context
+        if has_request_context() and current_user is not None:
+            return getattr(current_user, 'token', None)
+        return None
+
+    def abandon_page(self, page_id):
+        """
+        cancel the callbacks in flight of the page left by the current session
+        :param page_id: the page id
+        """
+        self.supersession.abandon(self._current_session_id(), page_id)
+
+    def _is_warmable(self, comp_key):
+        """
+        whether the component data can be warmed, the data of the component must only depend on the filters
+        """
+        comp = self.config_dict['components'][comp_key]
+        if 'dataset' in comp:
+            return not self.datasets.resolve(comp['dataset'], self.name).session_scoped
+        return 'task' in comp or ('query' in comp and 'conn' in comp)
+
+    def _is_warmed(self, comp_key):
+        subscribes = self.config_dict.get('subscribes') or {}
+        return any(comp_key in (job.components or subscribes) for job in self.warmups) and \
+            self._is_warmable(comp_key)
+
+    def _warm_cache_key(self, comp_key, kwargs):
+        import hashlib
+        params = repr(sorted((name, repr(value)) for name, value in kwargs.items()))
+        return '-'.join([self.name, comp_key, 'warm', hashlib.sha1(params.encode('utf-8')).hexdigest()])
+
+    def warm_up(self, job, now):
+        """
+        load the component data of the filter sets into the shared cache
+        :param job: the warmup job
+        :param now: the time of the run
+        :return: the tuple of the warmed and planned loads
+        """
+        import time
+        from .warmup import render_filters, warmup_seconds, warmup_coverage, logger
+        subscribes = self.config_dict.get('subscribes') or {}
+        start = time.perf_counter()
+        warmed, planned = 0, 0
+        for comp_key in job.components or list(subscribes):
+            if not self._is_warmable(comp_key):
+                continue
+            comp = self.config_dict['components'][comp_key]
+            input_as = [input_item['as'] for input_item in subscribes[comp_key][1:]]
+            for values in job.filters:
+                planned += 1
+                values = render_filters(values, now)
+                if not all(name in values for name in input_as):
+                    continue
+                kwargs = {name: values[name] for name in input_as}
+                try:
+                    data = self._fetch_component_data(comp, comp_key=comp_key, **kwargs)
+                    self.cache.set(self._warm_cache_key(comp_key, kwargs), data, timeout=job.timeout)
+                except Exception:
+                    # the other loads of the job are still warmed
+                    logger.exception('cache warming of component [%s] of dashboard [%s] failed with %s',
+                                     comp_key, self.name, kwargs)
+                    continue
+                warmed += 1
+
+        elapsed = time.perf_counter() - start
+        warmup_seconds.observe(elapsed, self.name)
+        warmup_coverage.set(self.name, value=warmed / planned if planned else 1)
+        logger.info('cache warming of dashboard [%s] %d/%d loads in %.3fs', self.name, warmed, planned, elapsed)
+        return warmed, planned
+
+    def _load_component_data(self, comp, *, comp_key=None, **kwargs):
+        if comp_key and self._is_warmed(comp_key):
+            from .warmup import warm_total
+            data = self.cache.get(self._warm_cache_key(comp_key, kwargs))
+            warm_total.inc(self.name, comp_key, 'miss' if data is None else 'hit')
+            if data is not None:
+                return data
+        return self._fetch_component_data(comp, comp_key=comp_key, **kwargs)
+
+    def _fetch_component_data(self, comp, *, comp_key=None, **kwargs):
+        if 'dataset' in comp:
+            dataset = self.datasets.resolve(comp['dataset'], self.name)
+            data = self.datasets.load(dataset, session_id=self._current_session_id(), **kwargs)
+        elif 'task' in comp:
+            with span('parade.task.execute', task=comp['task'], dashboard=self.name):
+                data = self.context.get_task(comp['task']).execute_internal(self.context, **kwargs)
         elif 'query' in comp and 'conn' in comp:
-            data = self.context.load_query(comp['query'], conn=comp['conn'], **kwargs)
+            query = comp['query']
+            if comp_key in self.pushdowns:
+                query = self.pushdowns[comp_key].to_clause(query, **kwargs)
+            with span('parade.query', conn=comp['conn'], dashboard=self.name):
+                data = self.context.load_query(query, conn=comp['conn'], **kwargs)
         else:
-            assert comp['type'] != 'store', 'the task/query of store is *REQUIRED*'
+            assert comp['type'] != 'store', 'the task/query/dataset of store is *REQUIRED*'
             data = kwargs.get('data', [])
 
         import pandas as pd
-        if comp['type'] == 'store' and isinstance(data, pd.DataFrame):
+        if comp['type'] == 'store' and comp.get('subType') != 'server' and isinstance(data, pd.DataFrame):
             return data.to_dict(orient='records')
 
         return data
 
-    def _render_component(self, comp, data):
+    def _render_component(self, comp, data, comp_id=None):
+        if comp['type'] == 'store' and comp.get('subType') == 'server':
+            return self.server_store.put(comp_id, data, session_id=self._current_session_id())
         if comp['type'] == 'filter':
             return self._render_component_filter(comp, data)
         if comp['type'] == 'table':
             return self._render_component_table(comp, data)
         if comp['type'] == 'chart':
-            return self._render_component_chart(comp, data)
+            return self._render_component_chart(comp, data, chart_id=comp_id)
         return data
 
     def _render_component_filter(self, component, data):
@@ -288,28 +575,23 @@ class ConfigurableDashboard(Dashboard):
         filter_main = filter_class(self.context)
         return filter_main.init_layout(filter_id, component, data)
 
-    def _render_component_chart(self, chart, data):
+    def _load_chart_main(self, chart):
         assert chart['type'] == 'chart', 'invalid chart component'
         from .chart import load_chart_component_class
         chart_class = load_chart_component_class(self.context, chart['subType'])
-        chart_main = chart_class(
+        return chart_class(
             self.context,
             title=chart['title'],
             xlabel=None,
             ylabel=None,
         )
-        return chart_main.refresh_layout(chart, data)
+
+    def _render_component_chart(self, chart, data, chart_id=None):
+        chart_main = self._load_chart_main(chart)
+        return chart_main.refresh_layout(chart, data, graph_id=chart_id + '-graph' if chart_id else None)
 
     def _init_component_chart(self, chart_id, chart, data):
-        assert chart['type'] == 'chart', 'invalid chart component'
-        from parade.server.dash.chart import load_chart_component_class
-        chart_class = load_chart_component_class(self.context, chart['subType'])
-        chart_main = chart_class(
-            self.context,
-            title=chart['title'],
-            xlabel=None,
-            ylabel=None,
-        )
+        chart_main = self._load_chart_main(chart)
         return chart_main.init_layout(chart_id, chart, data)
 
     def _init_component_table(self, table_id, table, data):
@@ -329,25 +611,41 @@ class ConfigurableDashboard(Dashboard):
     def _render_component_func(self, comp_key, input_arg_names):
         import functools
 
+        def resolve_handle(value):
+            if not is_handle(value):
+                return value
+            data = self.server_store.resolve(value, session_id=self._current_session_id())
+            if data is None:
+                # the data of the server store expired
+                raise PreventUpdate
+            return data
+
         def render_func_generator(key, *args):
-            kwargs = dict(zip(input_arg_names, args))
+            kwargs = {name: resolve_handle(value) for name, value in zip(input_arg_names, args)}
+            handles = {name: value['version'] for name, value in zip(input_arg_names, args) if is_handle(value)}
             comp = self.config_dict['components'][key]
             cached = 'cache' in comp and comp['cache'] == 'true'
+            timer = ComponentTimer(self.name, key)
 
             if not cached:
-                comp_data = self._load_component_data(comp, **kwargs)
+                with timer.phase('load'):
+                    comp_data = self._load_component_data(comp, comp_key=key, **kwargs)
             else:
                 # set the default cache timeout to 10 seconds
                 cache = self.cache
+                cache_missed = []
 
                 @cache.memoize(timeout=10)
                 def reload_data(cache_key):
-                    data = self._load_component_data(comp, **kwargs)
+                    cache_missed.append(cache_key)
+                    data = self._load_component_data(comp, comp_key=key, **kwargs)
                     return data
 
                 param_key = ''
                 for param in sorted(kwargs.keys()):
-                    if kwargs.get(param):
+                    if param in handles:
+                        param_key += '-' + handles[param]
+                    elif kwargs.get(param):
                         param_key += '-' + kwargs.get(param)
 
                 # If we enable auth check then we can get our user id & session id from current_user
@@ -355,18 +653,78 @@ class ConfigurableDashboard(Dashboard):
                 if current_user is not None:
                     session_id = current_user.token
                     cache_key = self.name + '-' + session_id + '-' + key + '-' + param_key
-                comp_data = reload_data(cache_key)
-
-            if 'convert' in comp:
-                dash_mod = import_module(self.context.name + '.dashboard')
-                output_processor = getattr(dash_mod, '_converter_' + comp['convert'])
-                comp_data = output_processor(comp_data)
-
-            output = self._render_component(comp, comp_data)
+                with timer.phase('load'):
+                    comp_data = reload_data(cache_key)
+                timer.record_cache(hit=not cache_missed)
+            timer.record_rows(comp_data)
+            # the data of the superseded callback is abandoned
+            cancel.check()
+
+            if key in self.converters:
+                with timer.phase('convert'):
+                    comp_data = self.converters[key](comp_data)
+            if self._is_resampled(comp):
+                self.cache.set(self._resample_cache_key(key, self._current_session_id()), comp_data,
+                               timeout=self.RESAMPLE_CACHE_TIMEOUT)
+
+            with timer.phase('render'):
+                output = self._render_component(comp, comp_data, comp_id=self.name + '_' + key)
+            timer.finish()
 
             return output
 
-        return functools.partial(render_func_generator, comp_key)
+        return self.supersession.wrap(comp_key, functools.partial(render_func_generator, comp_key),
+                                      self._current_session_id, debounce=self._debounce(comp_key))
+
+    def _debounce(self, comp_key):
+        """
+        get the debounce of the subscribed component, the longest debounce of its filters
+        """
+        inputs = (self.config_dict.get('subscribes') or {}).get(comp_key, [])[1:]
+        components = self.config_dict['components']
+        return max([debounce_of(components[input_item['key']]) for input_item in inputs
+                    if input_item['key'] in components] or [0])
+
+    def _patch_component_func(self, comp_key, input_arg_names):
+        render_component = self._render_component_func(comp_key, input_arg_names)
+
+        def patch_component(*args):
+            version = args[-1]
+            output = render_component(*args[:-1])
+            return self.render_history.patch(output, version)
+
+        return patch_component
+
+    def _submit_component_func(self, comp_key, input_arg_names):
+        render_component = self._render_component_func(comp_key, input_arg_names)
+
+        def submit_component(*args):
+            return self.background_jobs.submit(comp_key, render_component, *args)
+
+        return submit_component
+
+    def _poll_component_func(self):
+        from .background import RUNNING, DONE, FAILED
+
+        def poll_component(n_intervals, job_id):
+            if not job_id:
+                raise PreventUpdate
+            status = self.background_jobs.status(job_id)
+            if status is None:
+                # the job expired
+                return dash.no_update, True, None
+            if status['status'] == RUNNING:
+                progress = int(status['progress'] * 100)
+                return dash.no_update, False, html.Div([html.Progress(value=str(progress), max='100'),
+                                                        html.Span(status['message'] or '{}%'.format(progress))],
+                                                       className='parade-progress')
+            if status['status'] == DONE:
+                return status['result'], True, None
+            if status['status'] == FAILED:
+                return html.Div(status['message'], className='parade-error'), True, None
+            return dash.no_update, True, None
+
+        return poll_component
 
     @property
     def layout(self):
@@ -385,8 +743,18 @@ class ConfigurableDashboard(Dashboard):
             user_id = current_user.id
 
         layout = []
-        layout.extend(self.parsed_layout)
+        layout.extend(self.static_layout)
         layout.append(html.Div(session_id, id=self.name + '_session-id', style={'display': 'none'}))
         layout.append(html.Div(user_id, id=self.name + '_user-id', style={'display': 'none'}))
+        layout.append(html.Div(str(uuid.uuid4()), id=self.name + '_page-id', style={'display': 'none'}))
 
         return layout
+
+    @property
+    def static_layout(self):
+        """
+        get the parsed layout of the dashboard, the hidden session, user and page of the layout are
+        appended in the browser
+        :return: the static dash-layout segment of the dashboard
+        """
+        return self.parsed_layout
@@ -0,0 +1,122 @@
+"""
+Background execution of the slow subscribed components.
+
+The subscribed components of ``background: true`` do not load and render in
+the request thread of the callback: the callback only submits a job to the
+thread pool of the background jobs and returns at once. The job status, the
+progress and the rendered result are kept in the shared (disk-backed)
+dashboard cache, and the browser polls the job with a ``dcc.Interval``,
+showing the progress of the job until the result is rendered. The tasks can
+report the progress of their execution with::
+
+    from parade.server.dash.background import report_progress
+    report_progress(0.5, 'half done')
+
+The pool size, the polling interval (milliseconds) and the seconds to keep
+the job results are configured by ``dash.background.workers``,
+``dash.background.interval`` and ``dash.background.timeout``.
+"""
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from dash.exceptions import PreventUpdate
+from flask import copy_current_request_context, has_request_context
+
+from ..metrics import registry
+
+DEFAULT_WORKERS = 4
+"""Default threads running the background jobs."""
+
+DEFAULT_INTERVAL = 1000
+"""Default milliseconds between the polls of the browser."""
+
+DEFAULT_TIMEOUT = 600
+"""Default seconds to keep the job status and result."""
+
+RUNNING = 'running'
+DONE = 'done'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+logger = logging.getLogger('Parade.Dash')
+
+jobs_total = registry.counter('parade_dash_background_jobs_total', 'Background jobs of the components by status',
+                              ('dashboard', 'component', 'status'))
+jobs_running = registry.gauge('parade_dash_background_jobs_running', 'Background jobs submitted and not finished',
+                              ('dashboard',))
+
+_current = threading.local()
+
+
+def report_progress(progress, message=None):
+    """
+    report the progress of the background job running in the current thread, ignored out of any job
+    :param progress: the progress between 0 and 1
+    :param message: the message of the progress
+    """
+    job = getattr(_current, 'job', None)
+    if job is not None:
+        manager, job_id = job
+        manager.update(job_id, status=RUNNING, progress=max(0.0, min(1.0, float(progress))), message=message)
+
+
+class BackgroundJobs(object):
+    def __init__(self, name, cache, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT):
+        """
+        :param name: the dashboard name
+        :param cache: the shared cache to keep the job status and result
+        :param workers: the threads running the jobs
+        :param timeout: the seconds to keep the job status and result
+        """
+        self.name = name
+        self.cache = cache
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='parade-job')
+
+    @staticmethod
+    def _cache_key(job_id):
+        return 'parade-job-' + job_id
+
+    def update(self, job_id, **status):
+        self.cache.set(self._cache_key(job_id), status, timeout=self.timeout)
+
+    def status(self, job_id):
+        """
+        get the status of the job
+        :param job_id: the job id
+        :return: the status dict of `status`, `progress`, `message` and `result`, None if not found
+        """
+        return self.cache.get(self._cache_key(job_id)) if job_id else None
+
+    def submit(self, comp_key, func, *args):
+        """
+        submit the job running in the copied request context of the callback
+        :param comp_key: the component key
+        :param func: the job function
+        :param args: the job arguments
+        :return: the job id
+        """
+        job_id = uuid.uuid4().hex
+        self.update(job_id, status=RUNNING, progress=0.0, message=None)
+
+        def run():
+            _current.job = (self, job_id)
+            try:
+                self.update(job_id, status=DONE, progress=1.0, message=None, result=func(*args))
+                jobs_total.inc(self.name, comp_key, DONE)
+            except PreventUpdate:
+                self.update(job_id, status=SKIPPED, progress=1.0, message=None)
+                jobs_total.inc(self.name, comp_key, SKIPPED)
+            except Exception as e:
+                logger.exception('background job of component [%s.%s] failed', self.name, comp_key)
+                self.update(job_id, status=FAILED, progress=1.0, message=str(e))
+                jobs_total.inc(self.name, comp_key, FAILED)
+            finally:
+                _current.job = None
+                jobs_running.dec(self.name)
+
+        jobs_running.inc(self.name)
+        self.executor.submit(copy_current_request_context(run) if has_request_context() else run)
+        return job_id
@@ -1,7 +1,11 @@
+import pandas as pd
 import plotly.graph_objects as go
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
 
 from .. import DashboardComponent
 from ..utils import validate, min_graph
+from ..utils.downsample import downsample
+from ..utils.figure import compact_figure
 
 
 class CustomChart(DashboardComponent):  # noqa: H601
@@ -14,6 +18,15 @@ class CustomChart(DashboardComponent):  # noqa: H601
 
     """
 
+    validate = False
+    """Validate the properties of the internally built figures with plotly validators. Default is to skip."""
+
+    render_modes = ('auto', 'svg', 'webgl')
+    """Supported values of the `render_mode` argument."""
+
+    webgl_threshold = 20000
+    """Number of plotted points above which the `auto` render mode switches to WebGL traces."""
+
     _axis_range = {}
     _axis_range_schema = {
         'x': {
@@ -66,6 +79,40 @@ class CustomChart(DashboardComponent):  # noqa: H601
         """Initialize the mutable data members to prevent modifying one attribute and impacting all instances."""
         pass
 
+    def is_webgl(self, n_points, **kwargs):
+        """Decide whether to render with WebGL traces from the `render_mode` and `webgl_threshold` arguments.
+
+        Args:
+            n_points: number of points to plot
+            kwargs: the chart arguments
+
+        Returns:
+            bool: True if the WebGL traces should be used
+
+        """
+        render_mode = kwargs.get('render_mode', 'auto')
+        assert render_mode in self.render_modes, 'invalid render mode ' + str(render_mode)
+        if render_mode == 'auto':
+            return n_points > int(kwargs.get('webgl_threshold', self.webgl_threshold))
+        return render_mode == 'webgl'
+
+    def render_figure(self, df_raw, **kwargs):
+        """Create the figure and encode it compactly for the Dash callback response.
+
+        Args:
+            df_raw: data to pass to formatter method
+            kwargs: the chart arguments, `float_precision` to round the float arrays to N decimals and
+                `binary_arrays` to encode the numeric arrays as plotly.js typed arrays
+
+        Returns:
+            dict: the figure for `dcc.Graph`
+
+        """
+        fig = self.create_figure(df_raw, **kwargs)
+        precision = kwargs.get('float_precision')
+        return compact_figure(fig, precision=int(precision) if precision is not None else None,
+                              binary=str(kwargs.get('binary_arrays', False)).lower() == 'true')
+
     def create_figure(self, df_raw, **kwargs_data):
         """Create the figure dictionary.
 
@@ -148,7 +195,7 @@ class CustomChart(DashboardComponent):  # noqa: H601
 
         return layout
 
-    def refresh_layout(self, chart, data):
+    def refresh_layout(self, chart, data, graph_id=None):
         import dash_html_components as html
         render_output = [
             html.H4(children=chart['title'], style={
@@ -156,16 +203,135 @@ class CustomChart(DashboardComponent):  # noqa: H601
             }),
         ]
         if len(data) > 0:
-            fig = self.create_figure(data, **chart['args']) if 'args' in chart and chart[
-                'args'] else self.create_figure(data)
-            render_output.append(min_graph(figure=fig))
+            fig = self.render_figure(data, **chart['args']) if 'args' in chart and chart[
+                'args'] else self.render_figure(data)
+            render_output.append(min_graph(figure=fig, id=graph_id) if graph_id else min_graph(figure=fig))
         return render_output
 
     def init_layout(self, chart_id, chart, data):
         import dash_html_components as html
         if len(data) == 0:
             return html.Div(id=chart_id)
-        return html.Div(self.refresh_layout(chart, data), id=chart_id)
+        return html.Div(self.refresh_layout(chart, data, graph_id=chart_id + '-graph'), id=chart_id)
+
+
+class CategoryChart(CustomChart):
+    """Base Class for charts plotting the numeric category columns of the data against its key column."""
+
+    DEFAULT_OBJ_COL = 'key'
+    """Default name of the key column."""
+
+    DEFAULT_NUMERIC_PLACEHOlDER = 0
+    """Default value to fill the missing numeric values."""
+
+    def get_index_column(self, df_raw, **kwargs):
+        """Return the key column of the data, taken from the `key` argument if no default key column found."""
+        index_column = self.DEFAULT_OBJ_COL
+        if index_column not in df_raw.columns:
+            index_column = kwargs.get('key')
+        assert index_column, 'the index column not found'
+        return index_column
+
+    def get_placeholder(self, **kwargs):
+        """Return the value to fill the missing numeric values, taken from the `placeholder` argument."""
+        placeholder = self.DEFAULT_NUMERIC_PLACEHOlDER
+        if "placeholder" in kwargs:
+            try:
+                placeholder = float(kwargs.get("placeholder"))
+            except ValueError:
+                placeholder = 0
+        return placeholder
+
+    def select_categories(self, df_raw, **kwargs):
+        """Select the numeric category columns and fill their missing values without modifying `df_raw`.
+
+        Args:
+            df_raw: pandas dataframe with the key column and the category columns
+            kwargs: the chart arguments
+
+        Returns:
+            tuple: the key column name and the dataframe of filled category values
+
+        """
+        index_column = self.get_index_column(df_raw, **kwargs)
+        values = df_raw.select_dtypes(include=['number', 'bool'])
+        categories = [c for c in values.columns if c != index_column and 'Unname' not in str(c)]
+        assert categories, 'no category column provided'
+        return index_column, values[categories].fillna(self.get_placeholder(**kwargs))
+
+    def create_figure(self, df_raw, **kwargs):
+        """Create the figure with one construction call from the category traces and layout.
+
+        The rows can be restricted to the keys within the `x_range` argument, e.g. the zoomed x-axis range.
+        """
+        index_column, values = self.select_categories(df_raw, **kwargs)
+        keys = df_raw[index_column]
+        if kwargs.get('x_range'):
+            in_range = _in_range(keys, kwargs['x_range'])
+            keys, values = keys[in_range], values[in_range]
+        return go.Figure(data=self.create_category_traces(keys, values, **kwargs),
+                         layout=self.create_category_layout(**kwargs), _validate=self.validate)
+
+    def count_points(self, keys, n_series, **kwargs):
+        """Return the number of points plotted for `n_series` series after downsampling."""
+        n_keys = len(keys)
+        if kwargs.get('max_points'):
+            n_keys = min(n_keys, int(kwargs['max_points']))
+        return n_keys * n_series
+
+    def downsample_series(self, keys, series, **kwargs):
+        """Downsample the series to the `max_points` argument with the `downsample` method (default `lttb`).
+
+        Args:
+            keys: pandas series of the key column, sorted here if numeric or datetime
+            series: pandas series of the category values
+
+        Returns:
+            tuple: the downsampled keys and values
+
+        """
+        if not kwargs.get('max_points') or len(keys) <= int(kwargs['max_points']):
+            return keys, series
+        if is_datetime64_any_dtype(keys) or is_numeric_dtype(keys):
+            # the query results are not ordered, the buckets must follow the x-axis
+            order = keys.to_numpy().argsort(kind='stable')
+            keys, series = keys.iloc[order], series.iloc[order]
+        return downsample(keys, series, kwargs['max_points'], kwargs.get('downsample', 'lttb'))
+
+    def create_category_traces(self, keys, values, **kwargs):
+        """Return traces for plotly chart.
+
+        Args:
+            keys: pandas series of the key column
+            values: pandas dataframe of the filled category values
+            kwargs: the chart arguments
+
+        Raises:
+            NotImplementedError: Must be overridden by child class
+
+        """
+        raise NotImplementedError('create_category_traces must be implemented by child class')  # pragma: no cover
+
+    def create_category_layout(self, **kwargs):
+        """Return the layout for plotly chart. Can be overridden when inherited.
+
+        Returns:
+            dict: layout for Dash figure
+
+        """
+        return {}
+
+
+def _in_range(keys, x_range):
+    """Return the mask of the keys within the plotted x-axis range."""
+    lower, upper = x_range
+    if is_datetime64_any_dtype(keys):
+        return keys.between(pd.Timestamp(lower), pd.Timestamp(upper))
+    if is_numeric_dtype(keys):
+        return keys.between(float(lower), float(upper))
+    # the categorical axis is ranged by the positions of the keys
+    positions = pd.Series(range(len(keys)), index=keys.index)
+    return positions.between(float(lower), float(upper))
 
 
 _driver_class_cache = {}
@@ -176,7 +342,7 @@ def load_chart_component_class(context, driver):
     # import pdb; pdb.set_trace()
     if driver not in _driver_class_cache:
         for chart_class in iter_classes(CustomChart, 'parade.server.dash.chart', context.name + '.dashboard.chart',
-                                        class_filter=lambda cls: cls != CustomChart):
+                                        class_filter=lambda cls: cls not in (CustomChart, CategoryChart)):
             chart_key = chart_class.__module__.split('.')[-1]
             if chart_key not in _driver_class_cache:
                 _driver_class_cache[chart_key] = chart_class
@@ -1,9 +1,13 @@
 from . import CustomChart
+from ..utils.geojson import load_geojson
 import plotly.graph_objects as go
 
 
 class ChoroplethMap(CustomChart):  # noqa: H601
-    """Gantt Chart: task and milestone timeline."""
+    """Choropleth Map: the z values of locations on the GeoJSON features."""
+
+    DEFAULT_FEATURE_ID_KEY = 'properties.NL_NAME_1'
+    """Default GeoJSON feature property to match the locations."""
 
     def create_figure(self, df, **kwargs):
         """Return traces for plotly chart.
@@ -15,35 +19,24 @@ class ChoroplethMap(CustomChart):  # noqa: H601
             list: Dash chart traces
 
         """
-        def get_geojson():
-            import json
-            from urllib.request import urlopen
-
-            geojson_map = kwargs.get('geojson_map', {})
-
-            if not geojson_map:
-                geojson_path = kwargs.get('geojson', None)
-                assert geojson_path, 'no geojson resource provided'
-
-                try:
-                    f = urlopen(geojson_path)
-                except ValueError:  # invalid URL
-                    import os
-                    f = open(geojson_path if os.path.isabs(geojson_path) else os.path.join(self.context.workdir, geojson_path), 'r')
-
-                try:
-                    geojson_map = json.load(f)
-                finally:
-                    f.close()
-
-            return geojson_map
+        geojson = kwargs.get('geojson_map', {})
+        if not geojson:
+            geojson_path = kwargs.get('geojson', None)
+            assert geojson_path, 'no geojson resource provided'
+            asset = load_geojson(self.context, geojson_path, tolerance=kwargs.get('geojson_tolerance'),
+                                 precision=kwargs.get('geojson_precision'))
+            # reference the served asset unless the geometry is required to be embedded into the figure,
+            # always embedded by the multi-process servers
+            embed = str(kwargs.get('geojson_embed', self.context.conf.get_or_else('dash.geojson.embed', False))) \
+                .lower() == 'true'
+            geojson = asset.geojson if embed else asset.url
 
         location_column = kwargs.get('location')
         z_column = kwargs.get('z')
 
         fig = go.Figure(go.Choroplethmapbox(
-            featureidkey="properties.NL_NAME_1",
-            geojson=get_geojson(),
+            featureidkey=kwargs.get('featureidkey', self.DEFAULT_FEATURE_ID_KEY),
+            geojson=geojson,
             locations=df[location_column],
             z=df[z_column],
             zauto=True,
@@ -1,8 +1,8 @@
-from ..utils import format_unix, get_unix
 from . import CustomChart
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 from palettable.tableau import tableau
-import arrow
 
 _NORMAL_COLOR_ = 'SteelBlue'
 _WARN_COLOR_ = 'firebrick'
@@ -26,7 +26,7 @@ class GanttChart(CustomChart):  # noqa: H601
     color_lookup = {}
 
     def create_traces(self, df_raw, **kwargs):
-        """Return traces for plotly chart.
+        """Return traces for plotly chart, batched per category with None-separated task segments.
 
         Args:
             df_raw: pandas dataframe with columns: `(category, label, start, end, progress)`
@@ -36,46 +36,35 @@ class GanttChart(CustomChart):  # noqa: H601
 
         """
         # If start is None, assign end to start so that the sort is correct
-        start_index = df_raw.columns.get_loc('start')
-        end_index = df_raw.columns.get_loc('end')
-        for index in [idx for idx, is_na in enumerate(df_raw['start'].isna()) if is_na]:
-            df_raw.iloc[index, start_index] = df_raw.iloc[index, end_index]
-        df_raw['progress'] = df_raw['progress'].fillna(0)  # Fill possibly missing progress values for milestones
-        df_raw['level'] = df_raw['issue_type'].apply(lambda t: 0 if t == 'Task' else 1)
-        df_raw = (df_raw
-                  .sort_values(by=['category', 'level', 'start', 'end'], ascending=False)
-                  .reset_index(drop=True))
+        df = df_raw.assign(
+            start=df_raw['start'].fillna(df_raw['end']),
+            # Fill possibly missing progress values for milestones
+            progress=df_raw['progress'].fillna(0),
+            level=(df_raw['issue_type'] != 'Task').astype(int),
+        )
+        df = (df
+              .sort_values(by=['category', 'level', 'start', 'end'], ascending=False)
+              .reset_index(drop=True))
 
         # Create color lookup using categories in sorted order
-        categories = set(df_raw['category'])
+        categories = df['category'].unique()
         self.color_lookup = {cat: self.pallette[idx % len(self.pallette)] for idx, cat in enumerate(categories)}
-        # Track which categories have been plotted
-        plotted_categories = []
-        # Create the Gantt traces
+
+        start = pd.to_datetime(df['start'], format=self.date_format)
+        end = pd.to_datetime(df['end'], format=self.date_format)
+        df['progress_end'] = (start + (end - start) * df['progress']).dt.strftime(self.date_format)
+        df['y_pos'] = df.index * self.rh
+        df['hover'] = self._create_hover_text(df, start, end)
+        df['text'], df['text_color'] = self._create_annotation_text(df)
+
         traces = []
-        # the current timestamp
-        now = arrow.now()
-        # the minimum task start timestamp
-        min_task_start = None
-        # the maximum task end timestamp
-        max_task_end = None
-        for task in df_raw.itertuples():
-            if not min_task_start or arrow.get(task.start) < arrow.get(min_task_start):
-                min_task_start = task.start
-            if not max_task_end or arrow.get(task.end) > arrow.get(max_task_end):
-                max_task_end = task.end
-
-            y_pos = task.Index * self.rh
-            is_first = task.category not in plotted_categories
-            plotted_categories.append(task.category)
-            traces.append(self._create_task_shape(task, y_pos, is_first))
-            if task.progress > 0:
-                traces.append(self._create_progress_shape(task, y_pos))
-            traces.append(self._create_annotation(task, y_pos))
-
-        if now.is_between(arrow.get(min_task_start), arrow.get(max_task_end)):
-            today = now.format('YYYY-MM-DD')
-            traces.append(self._create_date_boundary(today, len(df_raw) * self.rh))
+        for category, tasks in df.groupby('category', sort=False):
+            traces.extend(self._create_category_traces(category, tasks))
+
+        # mark today if it falls within the tasks
+        now = pd.Timestamp.now()
+        if start.min() < now < end.max():
+            traces.append(self._create_date_boundary(now.strftime(self.date_format), len(df) * self.rh))
 
         return traces
 
@@ -87,6 +76,7 @@ class GanttChart(CustomChart):  # noqa: H601
         :return:
         """
         return go.Scatter(
+            _validate=self.validate,
             line={'width': 4, 'dash': 'dash', 'color': _WARN_COLOR_},
             mode='lines',
             x=[mark_date, mark_date],
@@ -94,126 +84,118 @@ class GanttChart(CustomChart):  # noqa: H601
             showlegend=False,
         )
 
-    def _create_hover_text(self, task):
-        """Return hover text for given trace.
+    def _create_hover_text(self, df, start, end):
+        """Return hover text for all tasks.
 
         Args:
-            task: row tuple from df_raw with: `(category, label, start, end, progress)`
+            df: sorted dataframe with: `(category, label, start, end, progress)`
+            start: parsed start timestamps of the tasks
+            end: parsed end timestamps of the tasks
 
         Returns:
-            string: HTML-formatted hover text
+            series: HTML-formatted hover text
 
         """
-        dates = [format_unix(get_unix(str_ts, self.date_format), '%a, %Y-%m-%d') for str_ts in [task.start, task.end]]
-        if task.start != task.end:
-            date_range = f'<br><b>Start</b>: {dates[0]}<br><b>End</b>: {dates[1]}'
-        else:
-            date_range = f'<br><b>Milestone</b>: {dates[1]}'
-        return f'<b>{task.category}</b><br>{task.label} ({int(task.progress * 100)}%)<br>{date_range}'
+        start_text = start.dt.strftime('%a, %Y-%m-%d')
+        end_text = end.dt.strftime('%a, %Y-%m-%d')
+        date_range = ('<br><b>Start</b>: ' + start_text + '<br><b>End</b>: ' + end_text).where(
+            df['start'] != df['end'], '<br><b>Milestone</b>: ' + end_text)
+        progress = (df['progress'] * 100).astype(int).astype(str)
+        return ('<b>' + df['category'].astype(str) + '</b><br>' + df['label'].astype(str)
+                + ' (' + progress + '%)<br>' + date_range)
 
-    def _create_task_shape(self, task, y_pos, is_first):
-        """Create colored task scatter rectangle.
+    def _create_category_traces(self, category, tasks):
+        """Create the batched task, progress and annotation traces of one category.
 
         Args:
-            task: row tuple from df_raw with: `(category, label, start, end, progress)`
-            y_pos: top y-coordinate of task
-            is_first: if True, this is the first time a task of this category will be plotted
+            category: the category name
+            tasks: the rows of the category with the computed `(y_pos, progress_end, hover, text, text_color)`
 
         Returns:
-            trace: single Dash chart Scatter trace
+            list: Dash chart traces of the category
 
         """
+        color = self.color_lookup[category]
+        traces = []
 
-        color = self.color_lookup[task.category]
-        if task.sub_count > 0:
-            scatter_kwargs = dict(
+        is_group = tasks['sub_count'].fillna(0) > 0
+        groups, boxes = tasks[is_group], tasks[~is_group]
+        if len(boxes) > 0:
+            traces.append(go.Scatter(
+                _validate=self.validate,
+                fill='toself',
+                fillcolor=color,
+                hoverlabel=self.hover_label_settings,
+                hoveron='fills+points',
+                hovertemplate='%{hovertext}<extra></extra>',
+                legendgroup=color,
+                line={'width': 2, 'color': color},
+                mode='lines',
+                **self._box_segments(boxes['start'], boxes['end'], boxes['y_pos'], boxes['hover']),
+            ))
+        if len(groups) > 0:
+            y_pos = groups['y_pos']
+            traces.append(go.Scatter(
+                _validate=self.validate,
                 hoverlabel=self.hover_label_settings,
+                hovertemplate='%{hovertext}<extra></extra>',
                 legendgroup=color,
                 line={'width': 4, 'color': color},
                 mode='lines',
-                showlegend=is_first,
-                text=self._create_hover_text(task),
-                x=[task.start, task.start, task.end, task.end],
-                y=[y_pos - self.rh / 2, y_pos, y_pos, y_pos - self.rh / 2],
-            )
-        else:
-            scatter_kwargs = dict(
+                **_segments([groups['start'], groups['start'], groups['end'], groups['end']],
+                            [y_pos - self.rh / 2, y_pos, y_pos, y_pos - self.rh / 2], groups['hover']),
+            ))
+        traces[0].update(name=category, showlegend=True)
+        for trace in traces[1:]:
+            trace.update(showlegend=False)
+
+        progressed = tasks[tasks['progress'] > 0]
+        if len(progressed) > 0:
+            traces.append(go.Scatter(
+                _validate=self.validate,
                 fill='toself',
-                fillcolor=color,
-                hoverlabel=self.hover_label_settings,
+                fillcolor='white',
+                hoverinfo='skip',
                 legendgroup=color,
-                line={'width': 2, 'color': color},
+                line={'width': 1},
+                marker={'color': 'white'},
                 mode='lines',
-                showlegend=is_first,
-                text=self._create_hover_text(task),
-                x=[task.start, task.end, task.end, task.start, task.start],
-                y=[y_pos, y_pos, y_pos - self.rh, y_pos - self.rh, y_pos],
-            )
-        if is_first:
-            scatter_kwargs['name'] = task.category
-        return go.Scatter(**scatter_kwargs)
-
-    def _create_progress_shape(self, task, y_pos):
-        """Create semi-transparent white overlay `self.shapes` to indicate task progress.
-
-        Args:
-            task: row tuple from df_raw with: `(category, label, start, end, progress)`
-            y_pos: top y-coordinate of task
-
-        Returns:
-            trace: single Dash chart Scatter trace
-
-        """
-        unix_start = get_unix(task.start, self.date_format)
-        unix_progress = (get_unix(task.end, self.date_format) - unix_start) * task.progress + unix_start
-        end = format_unix(unix_progress, self.date_format)
-        return go.Scatter(
-            fill='toself',
-            fillcolor='white',
-            hoverinfo='skip',
-            legendgroup=self.color_lookup[task.category],
-            line={'width': 1},
-            marker={'color': 'white'},
-            mode='lines',
-            opacity=0.5,
-            showlegend=False,
-            x=[task.start, end, end, task.start, task.start],
-            y=[y_pos, y_pos, y_pos - self.rh, y_pos - self.rh, y_pos],
-        )
-
-    def _create_annotation(self, task, y_pos):
-        """Add task label to chart as text overlay.
+                opacity=0.5,
+                showlegend=False,
+                **self._box_segments(progressed['start'], progressed['progress_end'], progressed['y_pos']),
+            ))
 
-        Args:
-            task: row tuple from df_raw with: `(category, label, start, end, progress)`
-            y_pos: top y-coordinate of task
-
-        Returns:
-            trace: single Dash chart Scatter trace
-
-        """
         # For milestones with narrow fill, hover can be tricky, so intended to make the whole length of the text
         #   hoverable, but only the x/y point appears to be hoverable although it makes a larger hover zone at least
-        return go.Scatter(
+        traces.append(go.Scatter(
+            _validate=self.validate,
             hoverlabel=self.hover_label_settings,
-            hovertemplate=self._create_hover_text(task) + '<extra></extra>',
-            hovertext=self._create_hover_text(task),
-            legendgroup=self.color_lookup[task.category],
+            hovertemplate='%{hovertext}<extra></extra>',
+            hovertext=tasks['hover'].tolist(),
+            legendgroup=color,
             mode='text',
             showlegend=False,
-            text=self._create_annotation_text(task),
+            text=tasks['text'].tolist(),
             textposition='middle right',
-            textfont=dict(color=_NORMAL_COLOR_ if not task.warn else _WARN_COLOR_),
-            x=[task.end],
-            y=[y_pos - self.rh / 2],
-        )
+            textfont=dict(color=tasks['text_color'].tolist()),
+            x=tasks['end'].tolist(),
+            y=(tasks['y_pos'] - self.rh / 2).tolist(),
+        ))
+        return traces
 
-    def _create_annotation_text(self, task):
-        pure_text = ('' if not task.warn else '[' + task.warn + ']') + task.label
-        if task.link:
-            link_color = _NORMAL_COLOR_ if not task.warn else _WARN_COLOR_
-            return f'<a href="{task.link}" style="color:{link_color}">{pure_text}</a>'
-        return pure_text
+    def _box_segments(self, start, end, y_pos, text=None):
+        return _segments([start, end, end, start, start],
+                         [y_pos, y_pos, y_pos - self.rh, y_pos - self.rh, y_pos], text)
+
+    @staticmethod
+    def _create_annotation_text(df):
+        """Return the task labels and their colors to overlay on chart."""
+        warn = df['warn'].fillna('').astype(str)
+        link = df['link'].fillna('').astype(str)
+        color = pd.Series(np.where(warn != '', _WARN_COLOR_, _NORMAL_COLOR_), index=df.index)
+        pure_text = ('[' + warn + ']').where(warn != '', '') + df['label'].astype(str)
+        text = ('<a href="' + link + '" style="color:' + color + '">' + pure_text + '</a>').where(link != '', pure_text)
+        return text, color
 
     def create_layout(self, df_raw, **kwargs):
         """Extend the standard layout.
@@ -229,3 +211,28 @@ class GanttChart(CustomChart):  # noqa: H601
         layout['yaxis']['zeroline'] = False
         layout['height'] = (len(df_raw) + 5) * 20 + 260
         return layout
+
+
+def _segments(xs, ys, text=None):
+    """Join the vertices of many shapes into single x/y lists separated by None.
+
+    Args:
+        xs: list of per-vertex columns, each holding the x-coordinates of that vertex for all shapes
+        ys: list of per-vertex columns, each holding the y-coordinates of that vertex for all shapes
+        text: optional hover text of the shapes, repeated on every vertex of its shape
+
+    Returns:
+        dict: `x` and `y` (and `hovertext`) arguments for a single Scatter trace
+
+    """
+    def join(columns):
+        vertices = np.empty((len(columns[0]), len(columns) + 1), dtype=object)
+        for idx, column in enumerate(columns):
+            vertices[:, idx] = np.asarray(column, dtype=object)
+        vertices[:, -1] = None
+        return vertices.ravel().tolist()
+
+    segments = {'x': join(xs), 'y': join(ys)}
+    if text is not None:
+        segments['hovertext'] = join([text] * len(xs))
+    return segments
@@ -1,3 +1,5 @@
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 
 from . import CustomChart
@@ -5,6 +7,9 @@ from . import CustomChart
 
 class HeatMapChart(CustomChart):
 
+    DEFAULT_AGGFUNC = 'mean'
+    """Default function to aggregate the z values of the same (x, y) cell."""
+
     def create_figure(self, df_raw, **kwargs):
 
         from pandas.core.dtypes.common import is_numeric_dtype
@@ -16,11 +21,52 @@ class HeatMapChart(CustomChart):
         assert x_column, 'the x_column not found'
         assert y_column, 'the y_column not found'
         assert z_column, 'the z_column not found'
+        assert is_numeric_dtype(df_raw[z_column]), 'the z_column is not numeric'
+
+        z_matrix = self.aggregate(df_raw, **kwargs)
+
+        # Heatmapgl is deprecated in plotly 5 and removed in plotly 6, fall back to the svg Heatmap without it
+        heatmap = getattr(go, 'Heatmapgl', go.Heatmap) if self.is_webgl(z_matrix.size, **kwargs) else go.Heatmap
+        fig = go.Figure(
+            heatmap(x=z_matrix.columns, y=z_matrix.index, z=z_matrix.to_numpy(), colorscale='Viridis',
+                    _validate=self.validate),
+            _validate=self.validate
+        )
+        return fig
+
+    def aggregate(self, df_raw, **kwargs):
+        """Aggregate the long-format observations into the dense z-matrix.
+
+        Args:
+            df_raw: pandas dataframe with the x, y and z columns
+            kwargs: the `x_column`, `y_column` and `z_column`, `aggfunc` to aggregate the z values of a cell
+                (default `mean`), `x_bins` / `y_bins` to bin the numeric x / y axis into N buckets labeled with
+                their centers
+
+        Returns:
+            dataframe: the z-matrix indexed by y and with columns of x
+
+        """
+        x_column, y_column, z_column = kwargs['x_column'], kwargs['y_column'], kwargs['z_column']
+        x, x_labels = _bin_axis(df_raw[x_column], kwargs.get('x_bins'))
+        y, y_labels = _bin_axis(df_raw[y_column], kwargs.get('y_bins'))
+        z_matrix = (df_raw[z_column]
+                    .groupby([y.rename(y_column), x.rename(x_column)], sort=True)
+                    .agg(kwargs.get('aggfunc', self.DEFAULT_AGGFUNC))
+                    .unstack(x_column))
+        # keep the empty buckets so that the binned axes are evenly spaced
+        if x_labels is not None:
+            z_matrix = z_matrix.reindex(columns=x_labels)
+        if y_labels is not None:
+            z_matrix = z_matrix.reindex(index=y_labels)
+        return z_matrix
+
 
-        if not is_numeric_dtype(df_raw[z_column]):
-            assert "the z_column is not numeric"
-        else:
-            fig = go.Figure(
-                go.Heatmap(x=df_raw[x_column], y=df_raw[y_column], z=df_raw[z_column], colorscale='Viridis')
-            )
-            return fig
+def _bin_axis(values, bins):
+    """Map the numeric axis values to the centers of `bins` equal-width buckets, the values kept if no bins."""
+    if not bins:
+        return values, None
+    edges = np.histogram_bin_edges(values.dropna().to_numpy(dtype=float), bins=int(bins))
+    centers = (edges[:-1] + edges[1:]) / 2
+    positions = np.clip(np.searchsorted(edges, values.to_numpy(dtype=float), side='right') - 1, 0, len(centers) - 1)
+    return pd.Series(centers[positions], index=values.index).where(values.notna()), centers
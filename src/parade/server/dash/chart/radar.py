@@ -1,54 +1,63 @@
+import numpy as np
 import plotly.graph_objects as go
-from . import CustomChart
+from . import CategoryChart
+
+OTHERS_AGGS = ('mean', 'sum', 'min', 'max', 'median')
+"""The aggregations of the rest keys merged into `others`."""
 
-class RadarChart(CustomChart):  # noqa: H601
-    """Radar Chart: task and milestone timeline."""
 
-    DEFAULT_OBJ_COL = 'key'
-    # 默认数值型的填充值
-    DEFAULT_NUMERIC_PLACEHOlDER = 0
+class RadarChart(CategoryChart):  # noqa: H601
+    """Radar Chart: task and milestone timeline."""
 
-    def create_figure(self, df_raw, **kwargs):
-        from pandas.core.dtypes.common import is_numeric_dtype
-        index_column = self.DEFAULT_OBJ_COL
-        if index_column not in df_raw.columns:
-            index_column = kwargs.get('key')
+    def create_category_traces(self, keys, values, **kwargs):
+        """Return one polar trace per key, built from the value matrix of the categories.
 
-        assert index_column, 'the index column not found'
+        Args:
+            keys: pandas series of the key column
+            values: pandas dataframe of the filled category values
+            kwargs: `agg` to aggregate the rows of duplicated keys, `top` to keep the N keys with the largest
+                `top_by` category (default the sum of all categories), `others` to label the aggregation
+                (`others_agg`, default `mean`) of the rest keys
 
-        placeholder = self.DEFAULT_NUMERIC_PLACEHOlDER
-        if "placeholder" in kwargs:
-            try:
-                placeholder = float(kwargs.get("placeholder"))
-            except ValueError as e:
-                placeholder = 0
+        Returns:
+            list: Dash chart traces
 
-        categories = []
-        for column in df_raw.columns:
-            if column != index_column and is_numeric_dtype(df_raw[column]) and 'Unname' not in column:
-                df_raw[column] = df_raw[column].fillna(placeholder)
-                categories.append(column)
+        """
+        categories = list(values.columns)
+        keys, matrix = self._reduce_keys(keys, values, **kwargs)
+        scatter = go.Scatterpolargl if self.is_webgl(matrix.size, **kwargs) else go.Scatterpolar
+        return [scatter(r=r, theta=categories, fill='toself', name=key, _validate=self.validate)
+                for key, r in zip(keys, matrix)]
 
-        assert categories, 'no category column provided'
+    @staticmethod
+    def _reduce_keys(keys, values, **kwargs):
+        if kwargs.get('agg'):
+            values = values.groupby(keys.to_numpy(), sort=False).agg(kwargs['agg'])
+            keys = values.index
+        keys = np.asarray(keys)
+        matrix = values.to_numpy()
 
-        traces = []
+        top = int(kwargs.get('top') or 0)
+        top_by = kwargs.get('top_by')
+        others_agg = kwargs.get('others_agg', 'mean')
+        assert not top_by or top_by in values.columns, 'the top_by category not found: ' + str(top_by)
+        assert others_agg in OTHERS_AGGS, 'invalid others_agg {}, expected one of {}'.format(others_agg,
+                                                                                            ', '.join(OTHERS_AGGS))
+        if top <= 0 or len(keys) <= top:
+            return keys.tolist(), matrix
 
-        for _, item in df_raw.iterrows():
-            key = item[index_column]
-            r = [item[c] for c in categories]
-            trace = go.Scatterpolar(
-                r=r,
-                theta=categories,
-                fill='toself',
-                name=key
-            )
-            traces.append(trace)
+        score = matrix[:, values.columns.get_loc(top_by)] if top_by else matrix.sum(axis=1)
+        order = np.argsort(-score, kind='stable')
+        head, rest = order[:top], order[top:]
+        keys, top_matrix = keys[head].tolist(), matrix[head]
 
-        fig = go.Figure()
-        for trace in traces:
-            fig.add_trace(trace)
+        if kwargs.get('others'):
+            keys.append(kwargs['others'])
+            top_matrix = np.vstack([top_matrix, getattr(np, others_agg)(matrix[rest], axis=0)])
+        return keys, top_matrix
 
-        fig.update_layout(
+    def create_category_layout(self, **kwargs):
+        return go.Layout(
             polar=dict(
                 radialaxis=dict(
                     visible=True,
@@ -56,8 +65,6 @@ class RadarChart(CustomChart):  # noqa: H601
             showlegend=True if kwargs.get("showlegend") == "true" else False
         )
 
-        return fig
-
     # def create_traces(self, data_raw, **kwargs):
     #     """Return traces for plotly chart.
     #
@@ -1,53 +1,16 @@
 import plotly.graph_objects as go
 
-from . import CustomChart
-from ..utils.dictUtils import get_or_default
+from . import CategoryChart
 
 
-class ScatterChart(CustomChart):
-
-    DEFAULT_OBJ_COL = 'key'
-    # 默认数值型的填充值
-    DEFAULT_NUMERIC_PLACEHOlDER = 0
-
-    def create_figure(self, df_raw, **kwargs):
-
-        from pandas.core.dtypes.common import is_numeric_dtype
-        index_column = self.DEFAULT_OBJ_COL
-        if index_column not in df_raw.columns:
-            index_column = kwargs.get('key')
-
-        assert index_column, 'the index column not found'
-
-        placeholder = self.DEFAULT_NUMERIC_PLACEHOlDER
-        if "placeholder" in kwargs:
-            try:
-                placeholder = float(kwargs.get("placeholder"))
-            except ValueError as e:
-                placeholder = 0
-
-        categories = []
-        for column in df_raw.columns:
-            if column != index_column and is_numeric_dtype(df_raw[column]) and 'Unname' not in column:
-                df_raw[column] = df_raw[column].fillna(placeholder)
-                categories.append(column)
-
-        assert categories, 'no category column provided'
+class ScatterChart(CategoryChart):
 
+    def create_category_traces(self, keys, values, **kwargs):
+        mode = "markers" if kwargs.get("mode") is None else kwargs.get("mode")
+        scatter = go.Scattergl if self.is_webgl(self.count_points(keys, len(values.columns), **kwargs), **kwargs) \
+            else go.Scatter
         traces = []
-
-        for c in categories:
-            trace = go.Scatter(
-                x=df_raw[index_column],
-                y=df_raw[c],
-                name=c,
-                mode="markers" if kwargs.get("mode") is None else kwargs.get("mode")
-            )
-            traces.append(trace)
-
-        fig = go.Figure()
-        for trace in traces:
-            fig.add_trace(trace)
-
-        return fig
-
+        for c in values.columns:
+            x, y = self.downsample_series(keys, values[c], **kwargs)
+            traces.append(scatter(x=x, y=y, name=c, mode=mode, _validate=self.validate))
+        return traces
@@ -0,0 +1,106 @@
+"""
+Converters reshape the loaded component data before it is rendered.
+
+A converter is configured with the ``convert`` item of a component, which
+can either be the name of a python converter ``_converter_<name>`` defined
+in the ``dashboard`` module of the workspace, or a list of declarative steps
+executed as vectorized pandas operations, e.g.::
+
+    convert:
+      - rename: {gmv: sales}
+      - pivot: {index: day, columns: city, values: sales}
+      - fillna: 0
+
+The steps can be mixed with the names of python converters. All converters
+are resolved and validated once when the dashboard is parsed.
+"""
+from importlib import import_module
+
+import pandas as pd
+
+
+def _to_frame(data):
+    if isinstance(data, pd.DataFrame):
+        return data
+    return pd.DataFrame(data)
+
+
+def _step_rename(df, columns):
+    return df.rename(columns=columns)
+
+
+def _step_pivot(df, args):
+    assert 'index' in args and 'columns' in args, 'pivot requires both index and columns'
+    pivoted = df.pivot_table(index=args['index'], columns=args['columns'], values=args.get('values'),
+                             aggfunc=args.get('aggfunc', 'sum'), fill_value=args.get('fill_value'), sort=False)
+    if isinstance(pivoted.columns, pd.MultiIndex):
+        pivoted.columns = ['_'.join(str(level) for level in col) for col in pivoted.columns]
+    else:
+        pivoted.columns = [str(col) for col in pivoted.columns]
+    return pivoted.reset_index()
+
+
+def _step_fillna(df, value):
+    return df.fillna(value)
+
+
+def _step_aggregate(df, args):
+    assert 'by' in args and 'agg' in args, 'aggregate requires both by and agg'
+    return df.groupby(args['by'], as_index=False, sort=args.get('sort', False)).agg(args['agg'])
+
+
+def _step_query(df, expr):
+    return df.query(expr)
+
+
+_STEPS = {
+    'query': _step_query,
+    'rename': _step_rename,
+    'pivot': _step_pivot,
+    'fillna': _step_fillna,
+    'aggregate': _step_aggregate,
+}
+
+
+def _load_python_converter(context, name):
+    dash_mod = import_module(context.name + '.dashboard')
+    converter = getattr(dash_mod, '_converter_' + name, None)
+    assert callable(converter), 'converter [' + name + '] not found in ' + context.name + '.dashboard'
+    return converter
+
+
+def _load_step(context, step):
+    if isinstance(step, str):
+        return _load_python_converter(context, step)
+
+    assert isinstance(step, dict) and len(step) == 1, 'invalid converter step ' + str(step)
+    (step_name, step_args), = step.items()
+    assert step_name in _STEPS, 'unknown converter step [' + str(step_name) + ']'
+    step_func = _STEPS[step_name]
+
+    def run_step(data):
+        return step_func(_to_frame(data), step_args)
+
+    return run_step
+
+
+def load_converter(context, spec):
+    """
+    resolve the converter spec of a component into a single callable
+    :param context: the parade context
+    :param spec: the name of python converter or the list of converter steps
+    :return: the converter accepting the component data and returning the converted one
+    """
+    steps = spec if isinstance(spec, list) else [spec]
+    assert steps, 'empty converter pipeline'
+    converters = [_load_step(context, step) for step in steps]
+
+    if len(converters) == 1:
+        return converters[0]
+
+    def run_pipeline(data):
+        for converter in converters:
+            data = converter(data)
+        return data
+
+    return run_pipeline
@@ -0,0 +1,192 @@
+"""
+Shared datasets of the dashboard components.
+
+A dataset is a named task or query defined once, in the ``datasets`` section
+of a dashboard or in the ``dataset`` directory of the workspace (one yaml
+file per dataset, named by the file), and referenced by the components with
+the ``dataset`` item instead of their own ``task`` / ``query``. The
+component-specific reshaping is done by the ``convert`` steps of the
+components, e.g.::
+
+    datasets:
+      sales:
+        query: select * from sales
+        conn: dw
+    components:
+      gmv_by_city:
+        type: chart
+        subType: bar
+        dataset: sales
+        convert:
+          - query: "channel == 'online'"
+          - aggregate: {by: city, agg: {gmv: sum}}
+
+A dataset is evaluated once per combination of the filter values within the
+refresh window (``dash.dataset.timeout`` seconds): the concurrent and later
+loads of the same combination share the same DataFrame, across all the
+dependent components and dashboards. The shared frames should never be
+modified in place by the converters. The datasets of ``scope: session`` are
+only shared within the session. As the other loads wait for it, a shared
+load runs to the end even if the callback which started it is superseded or
+its page is left (see ``parade.server.dash.supersede``).
+"""
+import os
+import threading
+import time
+
+import pandas as pd
+
+from .store import data_version
+from ..cancel import activate
+from ..metrics import registry
+from ..tracing import span
+
+DEFAULT_TIMEOUT = 10
+"""Default seconds to share a loaded dataset."""
+
+dataset_total = registry.counter('parade_dash_dataset_total', 'Loads of the shared datasets by result',
+                                 ('dataset', 'result'))
+
+
+class Dataset(object):
+    def __init__(self, name, spec):
+        assert isinstance(spec, dict), 'invalid dataset ' + name
+        assert 'task' in spec or ('query' in spec and 'conn' in spec), \
+            'the task or query/conn of dataset [' + name + '] is *REQUIRED*'
+        assert spec.get('scope', 'global') in ('global', 'session'), 'invalid scope of dataset ' + name
+        self.name = name
+        self.spec = spec
+        self.pushdown = None
+        if spec.get('pushdown'):
+            assert 'query' in spec, 'pushdown requires the query of dataset ' + name
+            from .pushdown import QueryPushdown
+            self.pushdown = QueryPushdown(spec['pushdown'])
+
+    @property
+    def session_scoped(self):
+        return self.spec.get('scope') == 'session'
+
+    def load(self, context, **kwargs):
+        if 'task' in self.spec:
+            with span('parade.task.execute', task=self.spec['task'], dataset=self.name):
+                return context.get_task(self.spec['task']).execute_internal(context, **kwargs)
+        query = self.spec['query']
+        if self.pushdown:
+            query = self.pushdown.to_clause(query, **kwargs)
+        with span('parade.query', conn=self.spec['conn'], dataset=self.name):
+            return context.load_query(query, conn=self.spec['conn'], **kwargs)
+
+
+def _param_key(value):
+    # the frames (e.g. resolved from the server stores) are keyed by the content
+    return data_version(value) if isinstance(value, pd.DataFrame) else repr(value)
+
+
+class _Loading(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.data = None
+        self.error = None
+        self.expires = None
+
+
+def load_workspace_datasets(context):
+    """
+    load the datasets defined in the workspace
+    :param context: the parade context
+    :return: the dataset spec dict [dataset name => spec]
+    """
+    import yaml
+    specs = {}
+    dataset_dir = os.path.join(context.workdir, 'dataset')
+    if os.path.exists(dataset_dir):
+        for dataset_file in sorted(os.listdir(dataset_dir)):
+            if not os.path.isfile(os.path.join(dataset_dir, dataset_file)):
+                continue
+            with open(os.path.join(dataset_dir, dataset_file), 'r') as dataset_yaml:
+                spec = yaml.safe_load(dataset_yaml)
+            if spec:
+                specs[os.path.splitext(dataset_file)[0]] = spec
+    return specs
+
+
+class DatasetRegistry(object):
+    def __init__(self, context, specs=None, timeout=DEFAULT_TIMEOUT):
+        """
+        :param context: the parade context
+        :param specs: the workspace dataset spec dict
+        :param timeout: the seconds to share a loaded dataset
+        """
+        self.context = context
+        self.timeout = timeout
+        self.datasets = {}
+        self._lock = threading.Lock()
+        self._loadings = {}
+        for name, spec in (specs or {}).items():
+            self.register(name, spec)
+
+    def register(self, name, spec, dashboard=None):
+        """
+        register the dataset, the datasets of a dashboard are only visible to the dashboard
+        :param name: the dataset name
+        :param spec: the dataset spec
+        :param dashboard: the dashboard defining the dataset, None for the workspace
+        """
+        key = dashboard + '/' + name if dashboard else name
+        self.datasets[key] = Dataset(key, spec)
+
+    def resolve(self, name, dashboard=None):
+        """
+        get the dataset visible to the dashboard
+        :param name: the dataset name
+        :param dashboard: the dashboard name
+        :return: the dataset, or None if not defined
+        """
+        if dashboard and dashboard + '/' + name in self.datasets:
+            return self.datasets[dashboard + '/' + name]
+        return self.datasets.get(name)
+
+    def _purge(self, now):
+        for key in [key for key, loading in self._loadings.items()
+                    if loading.expires is not None and loading.expires <= now]:
+            del self._loadings[key]
+
+    def load(self, dataset, session_id=None, **kwargs):
+        """
+        load the dataset, shared with the other loads of the same filter values
+        :param dataset: the dataset
+        :param session_id: the session of the load
+        :param kwargs: the filter values
+        :return: the shared data of the dataset
+        """
+        key = (dataset.name, session_id if dataset.session_scoped else None,
+               tuple(sorted((name, _param_key(value)) for name, value in kwargs.items())))
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            loading = self._loadings.get(key)
+            owner = loading is None
+            if owner:
+                loading = self._loadings[key] = _Loading()
+
+        if not owner:
+            loading.done.wait()
+            if loading.error is not None:
+                raise loading.error
+            dataset_total.inc(dataset.name, 'shared')
+            return loading.data
+
+        dataset_total.inc(dataset.name, 'load')
+        try:
+            # not cancelled with the callback of the owner, the load is shared with the other callbacks
+            with activate(None):
+                loading.data = dataset.load(self.context, **kwargs)
+        except Exception as e:
+            loading.error = e
+            with self._lock:
+                self._loadings.pop(key, None)
+            raise
+        finally:
+            loading.expires = time.monotonic() + self.timeout
+            loading.done.set()
+        return loading.data
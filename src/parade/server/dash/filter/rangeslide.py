@@ -2,6 +2,7 @@ from parade.server.dash.filter import CustomFilter
 import dash_core_components as dcc
 
 from ..utils.dictUtils import get_or_default
+from ..supersede import debounce_of
 
 
 class RangeSlide(CustomFilter):
@@ -12,7 +13,8 @@ class RangeSlide(CustomFilter):
                 min=get_or_default(component,"min",0),
                 max=get_or_default(component,"max",100),
                 value=data if data is not None and len(data) == 2 else [0,100],
-                step=get_or_default(component,"step",1)
+                step=get_or_default(component,"step",1),
+                updatemode=get_or_default(component,"updatemode","drag" if debounce_of(component) else "mouseup")
 
             )
 
@@ -1,6 +1,7 @@
 from parade.server.dash.filter import CustomFilter
 import dash_core_components as dcc
 from ..utils.dictUtils import get_or_default
+from ..supersede import debounce_of
 
 
 class Slide(CustomFilter):
@@ -12,6 +13,7 @@ class Slide(CustomFilter):
             max=get_or_default(component, "min", 100),
             step=get_or_default(component, "step", 1),
             value=int(data[0]) if data != [] and data is not None else 0,
+            updatemode=get_or_default(component, "updatemode", "drag" if debounce_of(component) else "mouseup"),
 
         )
 
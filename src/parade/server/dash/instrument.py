@@ -0,0 +1,105 @@
+"""
+Instrumentation of the dashboard component rendering.
+
+Every rendering of a component is timed per phase: ``load`` (including the
+cache lookup), ``convert``, ``render`` (building the widget) and
+``serialize`` (from the callback return until the dash response is built).
+The timings, result rows, response bytes and cache hits are exported with
+the server metrics, and the callbacks slower than the ``dash.slowCallback``
+threshold (seconds) are logged.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+from ..metrics import registry, DEFAULT_SIZE_BUCKETS
+
+DEFAULT_SLOW_CALLBACK = 1.0
+"""Default threshold (seconds) to log a slow dashboard callback."""
+
+logger = logging.getLogger('Parade.Dash')
+
+phase_seconds = registry.histogram('parade_dash_phase_seconds', 'Time spent in each phase of component rendering',
+                                   ('dashboard', 'component', 'phase'))
+result_rows = registry.histogram('parade_dash_result_rows', 'Rows of the loaded component data',
+                                 ('dashboard', 'component'), buckets=DEFAULT_SIZE_BUCKETS)
+response_bytes = registry.histogram('parade_dash_response_bytes', 'Bytes of the component callback responses',
+                                    ('dashboard', 'component'), buckets=DEFAULT_SIZE_BUCKETS)
+cache_total = registry.counter('parade_dash_cache_total', 'Cache lookups of the component data',
+                               ('dashboard', 'component', 'result'))
+
+
+class ComponentTimer(object):
+    """Collect the phase timings of one component rendering."""
+
+    def __init__(self, dashboard, component):
+        self.dashboard = dashboard
+        self.component = component
+        self.timings = {}
+        self.rows = None
+        self.cache_hit = None
+        self.finished = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, elapsed):
+        self.timings[name] = self.timings.get(name, 0) + elapsed
+        phase_seconds.observe(elapsed, self.dashboard, self.component, name)
+
+    def record_rows(self, data):
+        if hasattr(data, '__len__'):
+            self.rows = len(data)
+            result_rows.observe(self.rows, self.dashboard, self.component)
+
+    def record_cache(self, hit):
+        self.cache_hit = hit
+        cache_total.inc(self.dashboard, self.component, 'hit' if hit else 'miss')
+
+    def finish(self):
+        """
+        finish the timing of the callback, the serialization is timed until the response is built
+        """
+        self.finished = time.perf_counter()
+        if has_request_context():
+            g.setdefault('parade_dash_timers', []).append(self)
+
+    @property
+    def total(self):
+        return sum(self.timings.values())
+
+    def describe(self):
+        phases = ', '.join('{}={:.3f}s'.format(name, elapsed) for name, elapsed in self.timings.items())
+        return '[{}.{}] {:.3f}s ({}), rows={}, cache_hit={}'.format(self.dashboard, self.component, self.total,
+                                                                   phases, self.rows, self.cache_hit)
+
+
+def init_instrument(server, context):
+    """
+    register the response hook to time the serialization of the dash callbacks
+    :param server: the flask server of the dash app
+    :param context: the parade context
+    """
+    slow_callback = float(context.conf.get_or_else('dash.slowCallback', DEFAULT_SLOW_CALLBACK))
+
+    @server.after_request
+    def record_callback_response(response):
+        timers = g.pop('parade_dash_timers', None) if has_request_context() else None
+        if not timers:
+            return response
+        size = None if response.is_streamed else response.calculate_content_length()
+        for timer in timers:
+            timer.observe('serialize', time.perf_counter() - timer.finished)
+            if size is not None:
+                response_bytes.observe(size, timer.dashboard, timer.component)
+            if timer.total >= slow_callback:
+                logger.warning('slow dashboard callback %s, response=%s bytes, path=%s', timer.describe(), size,
+                               request.path)
+        return response
@@ -0,0 +1,192 @@
+"""
+Serialized-layout cache of the dashboard navigation.
+
+The static part of every dashboard layout is serialized once and served by
+a GET route with ETag and Last-Modified, so the browsers revalidate it with
+a conditional request instead of receiving the full layout in a callback
+response on every navigation. The navigation itself runs in clientside
+callbacks: the content callback fetches the layout of the dashboard in the
+url, and the nav callback only switches the class names of the links.
+
+The callback graph of the page is scoped to the viewed dashboard (see
+``parade.server.dash.scope``), so the content callback also re-fetches the
+scoped graph when switching to another dashboard, and hands it to the dash
+renderer to recompute the graph before the new layout is rendered. The dash
+versions without the renderer store exposed (before 2.16) reload the page
+instead.
+
+Every rendered layout gets a new page id, which the subscribed callbacks send
+to supersede the older callbacks of the same page only (see
+``parade.server.dash.supersede``). The page left, closed or switched to
+another dashboard, is reported to the server with a beacon to cancel its
+callbacks in flight.
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime, timezone
+
+from flask import Response, request
+from plotly.utils import PlotlyJSONEncoder
+
+from .supersede import ABANDON_ROUTE
+
+LAYOUT_ROUTE = '_parade-layout/'
+"""The route (under the dash url base) to serve the serialized dashboard layouts."""
+
+_CONTENT_JS = """
+function(path) {
+    var base = %(base)s;
+    var banner = %(banner)s;
+    var name = path && path.indexOf(base) === 0 ? path.substring(base.length) : '';
+
+    function cookie(key) {
+        var match = document.cookie.match(new RegExp('(?:^|; )' + key + '=([^;]*)'));
+        return match ? decodeURIComponent(match[1]) : null;
+    }
+
+    function hidden(id, value) {
+        return {namespace: 'dash_html_components', type: 'Div',
+                props: {id: id, children: value, style: {display: 'none'}}};
+    }
+
+    function uuid() {
+        return window.crypto && crypto.randomUUID ? crypto.randomUUID() : String(Date.now()) + Math.random();
+    }
+
+    // the callbacks in flight of the page left are cancelled
+    function abandon() {
+        if (window.paradePage && navigator.sendBeacon) {
+            navigator.sendBeacon(base + %(abandon)s, window.paradePage);
+        }
+        window.paradePage = null;
+    }
+
+    // the callback graph of the page is scoped to the dashboard first viewed
+    if (window.paradeScope === undefined) {
+        window.paradeScope = name;
+        window.addEventListener('pagehide', abandon);
+    }
+    abandon();
+    if (!name) {
+        return banner;
+    }
+
+    function rescope() {
+        if (window.paradeScope === name) {
+            return Promise.resolve();
+        }
+        var store = window.dash_stores && window.dash_stores[0];
+        if (!store) {
+            window.location.reload();
+            return new Promise(function() {});
+        }
+        // the graph is scoped by the referrer, i.e. the url of the switched dashboard
+        return fetch(base + '_dash-dependencies', {credentials: 'same-origin'})
+            .then(function(response) { return response.json(); })
+            .then(function(dependencies) {
+                store.dispatch({type: 'dependenciesRequest', payload: {status: 200, content: dependencies}});
+                store.dispatch({type: 'SET_GRAPHS', payload: Object.assign({}, store.getState().graphs, {reset: true})});
+                window.paradeScope = name;
+                // the renderer recomputes the graph asynchronously, wait for it before rendering the layout
+                return new Promise(function(resolve) {
+                    var unsubscribe = store.subscribe(function() {
+                        if (!store.getState().graphs.reset) {
+                            unsubscribe();
+                            resolve();
+                        }
+                    });
+                    if (!store.getState().graphs.reset) {
+                        unsubscribe();
+                        resolve();
+                    }
+                });
+            });
+    }
+
+    var layoutRequest = fetch(base + %(route)s + encodeURIComponent(name), {credentials: 'same-origin'})
+        .then(function(response) { return response.ok ? response.json() : null; });
+    return Promise.all([layoutRequest, rescope()])
+        .then(function(results) {
+            var layout = results[0];
+            if (!layout) {
+                return banner;
+            }
+            // the session and user of the layout, as resolved by the server from the auth cookies
+            var session = cookie('sid') || uuid();
+            window.paradePage = uuid();
+            return [].concat(layout, [hidden(name + '_session-id', session), hidden(name + '_user-id', cookie('uid')),
+                                      hidden(name + '_page-id', window.paradePage)]);
+        });
+}
+"""
+
+_NAV_JS = """
+function(path) {
+    var base = %(base)s;
+    var keys = %(keys)s;
+    var name = path && path.indexOf(base) === 0 ? path.substring(base.length) : '';
+    var selected = keys.indexOf(name) >= 0;
+    return keys.map(function(key) { return selected ? (key === name ? 'active' : 'inactive') : ''; });
+}
+"""
+
+
+class SerializedLayout(object):
+    def __init__(self, layout):
+        self.content = json.dumps(layout, cls=PlotlyJSONEncoder).encode('utf-8')
+        self.etag = hashlib.sha1(self.content).hexdigest()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def nav_link_id(idx):
+    return 'dash-nav-{}'.format(idx)
+
+
+def init_layout_route(app, dashboards):
+    """
+    serve the serialized static layouts of the dashboards, serialized on the first request
+    :param app: the dash app
+    :param dashboards: the dashboard dict [dashboard name => dashboard]
+    """
+    lock = threading.Lock()
+    layouts = {}
+
+    def serve_layout(name):
+        if name not in dashboards:
+            return Response('Dashboard not found', 404)
+        with lock:
+            if name not in layouts:
+                layouts[name] = SerializedLayout(dashboards[name].static_layout)
+            layout = layouts[name]
+
+        response = Response(layout.content, mimetype='application/json')
+        response.set_etag(layout.etag)
+        response.last_modified = layout.last_modified
+        # always revalidated, the layout changes with the server restart
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+    route = app.config.url_base_pathname + LAYOUT_ROUTE
+    app.server.add_url_rule(route + '<name>', endpoint=route, view_func=serve_layout)
+
+
+def init_navigation(app, dashboards, banner):
+    """
+    register the clientside callbacks of the dashboard navigation
+    :param app: the dash app
+    :param dashboards: the dashboard dict [dashboard name => dashboard]
+    :param banner: the layout to show without a dashboard selected
+    """
+    from dash.dependencies import Input, Output
+
+    base = json.dumps(app.config.url_base_pathname)
+    app.clientside_callback(_CONTENT_JS % {'base': base, 'route': json.dumps(LAYOUT_ROUTE),
+                                           'abandon': json.dumps(ABANDON_ROUTE),
+                                           'banner': json.dumps(banner, cls=PlotlyJSONEncoder)},
+                            Output('dash-content', 'children'), [Input('dash-url', 'pathname')])
+    if dashboards:
+        app.clientside_callback(_NAV_JS % {'base': base, 'keys': json.dumps(list(dashboards))},
+                                [Output(nav_link_id(idx), 'className') for idx in range(len(dashboards))],
+                                [Input('dash-url', 'pathname')])
@@ -0,0 +1,170 @@
+"""
+Partial updates of the subscribed charts and tables.
+
+The subscribed widgets re-render their whole children (the title plus the
+full graph or table) on every filter change. With the partial updates, the
+server remembers the tree it last sent to the widget under a render version,
+which the browser keeps in a small ``<component id>-rendered`` store and
+sends back as the callback state. The next rendering is diffed against the
+remembered tree and only the changed properties, e.g. ``figure.data[0].y``
+or the ``data`` of the table, are sent as a Dash ``Patch``. Without a known
+version (the first rendering, a reloaded page, a version evicted or issued
+by another worker) the full children are sent as before.
+
+The remembered trees only keep the structure the diff walks into (the
+dicts and the short lists) and the small values, the other values (e.g. the
+data arrays, the long lists and strings) are kept as their digests, so the
+memory of the history does not grow with the data of the widgets. The
+partial updates require Dash 2.9+ and can be disabled with
+``dash.patch.enabled: false``, the trees remembered per process are limited
+by ``dash.patch.maxEntries``.
+"""
+import hashlib
+import json
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+from plotly.utils import PlotlyJSONEncoder
+
+try:
+    from dash import Patch, no_update
+except ImportError:
+    Patch = None
+    no_update = None
+
+DEFAULT_MAX_ENTRIES = 256
+"""Default rendered trees remembered per process."""
+
+MAX_LIST_DIFF = 32
+"""The lists longer than this (e.g. the data arrays and the table records) are replaced instead of diffed."""
+
+MAX_OPERATIONS = 200
+"""The patches with more operations than this are sent as the full children."""
+
+MAX_SCALAR_LENGTH = 64
+"""The strings longer than this are remembered as their digests."""
+
+
+def patch_supported():
+    return Patch is not None
+
+
+def to_tree(output):
+    """
+    get the tree of the rendered output as received by the browser, the components and figures are
+    expanded to their json dicts, the long lists and the other values are kept as they are
+    :param output: the rendered output
+    :return: the tree of dicts, lists and values
+    """
+    if hasattr(output, 'to_plotly_json'):
+        return to_tree(output.to_plotly_json())
+    if isinstance(output, dict):
+        return {key if isinstance(key, str) else json.dumps(key): to_tree(value) for key, value in output.items()}
+    if isinstance(output, (list, tuple)) and len(output) <= MAX_LIST_DIFF:
+        return [to_tree(value) for value in output]
+    return output
+
+
+def _digest(value):
+    if isinstance(value, (bool, int, float)) or value is None or \
+            (isinstance(value, str) and len(value) <= MAX_SCALAR_LENGTH):
+        return value
+    if isinstance(value, np.ndarray) and value.dtype.kind in 'biufcmM':
+        content = '{}{}'.format(value.dtype.str, value.shape).encode() + np.ascontiguousarray(value).tobytes()
+    else:
+        content = json.dumps(value, cls=PlotlyJSONEncoder).encode('utf-8')
+    # the digests are bytes, never found in the json trees
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def digest_tree(tree):
+    """
+    get the digest tree of the output tree to remember, the dicts and the short lists are kept and the
+    other values are replaced by their digests
+    :param tree: the output tree
+    :return: the digest tree
+    """
+    if isinstance(tree, dict):
+        return {key: digest_tree(value) for key, value in tree.items()}
+    if isinstance(tree, list) and len(tree) <= MAX_LIST_DIFF:
+        return [digest_tree(value) for value in tree]
+    return _digest(tree)
+
+
+def _diffable(old, new):
+    if isinstance(old, dict) and isinstance(new, dict):
+        return True
+    return isinstance(old, list) and isinstance(new, list) and len(old) == len(new) <= MAX_LIST_DIFF
+
+
+def diff_tree(patch, old, new, tree):
+    """
+    record the changes from the old tree to the new tree in the patch
+    :param patch: the patch of the old tree
+    :param old: the old digest tree
+    :param new: the new digest tree
+    :param tree: the new output tree, the values of the changes
+    :return: the number of recorded operations
+    """
+    operations = 0
+    if isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                del patch[key]
+                operations += 1
+        keys = new.keys()
+    else:
+        keys = range(len(new))
+
+    for key in keys:
+        if isinstance(new, dict) and key not in old:
+            patch[key] = tree[key]
+            operations += 1
+        elif old[key] != new[key]:
+            if _diffable(old[key], new[key]):
+                operations += diff_tree(patch[key], old[key], new[key], tree[key])
+            else:
+                patch[key] = tree[key]
+                operations += 1
+        if operations > MAX_OPERATIONS:
+            break
+    return operations
+
+
+class RenderHistory(object):
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._trees = OrderedDict()
+
+    def _remember(self, tree):
+        version = uuid.uuid4().hex
+        with self._lock:
+            self._trees[version] = tree
+            while len(self._trees) > self.max_entries:
+                self._trees.popitem(last=False)
+        return version
+
+    def _recall(self, version):
+        with self._lock:
+            return self._trees.get(version) if version else None
+
+    def patch(self, output, version):
+        """
+        get the update of the rendered output for the browser holding the render version
+        :param output: the rendered children
+        :param version: the render version held by the browser
+        :return: the tuple of the children update (full, patch or no update) and the new render version
+        """
+        tree = to_tree(output)
+        digests = digest_tree(tree)
+        old = self._recall(version)
+        if old is not None and _diffable(old, digests):
+            if old == digests:
+                return no_update, no_update
+            patch = Patch()
+            if diff_tree(patch, old, digests, tree) <= MAX_OPERATIONS:
+                return patch, self._remember(digests)
+        return output, self._remember(digests)
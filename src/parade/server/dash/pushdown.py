@@ -0,0 +1,171 @@
+"""
+Filter-to-query pushdown of the query-backed components.
+
+The ``pushdown`` item of a component with ``query`` and ``conn`` compiles the
+filtering, aggregation, sorting and limits into a subquery wrapping the
+component query, so the database reduces the data instead of the web
+process, e.g.::
+
+    query: select * from orders
+    conn: dw
+    pushdown:
+      where:
+        city: city                          # `=`, or `IN` if the filter value is a list
+        dt: {op: '>=', param: start_date}
+      aggregate: {by: [city], agg: {gmv: sum, order_id: count_distinct}}
+      sort: [gmv desc, city]
+      limit: 1000
+      top: {by: gmv, n: 10}                 # shortcut of `sort: [gmv desc]` and `limit: 10`
+
+compiles into (as rendered by the sqlite or mysql dialect)::
+
+    SELECT _parade_q.city, sum(_parade_q.gmv) AS gmv, count(DISTINCT _parade_q.order_id) AS order_id
+    FROM (select * from orders) AS _parade_q
+    WHERE _parade_q.city = ? AND _parade_q.dt >= ?
+    GROUP BY _parade_q.city ORDER BY gmv DESC LIMIT ? OFFSET ?
+
+The wrapper is built as a sqlalchemy select, so the dialect of the connection
+renders the limit (e.g. ``TOP`` on MSSQL, ``ROWNUM`` on the older Oracle) and
+quotes the identifiers where required, e.g. the reserved words. The filter
+values are never rendered into the sql but bound as parameters. The
+conditions of the empty filter values are left out. The column names must be
+plain identifiers, and they are validated with the functions and operators
+when the dashboard is parsed.
+"""
+import operator
+import re
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# the named params of the sqlalchemy text clause
+_BIND_PARAM = re.compile(r'(?<![:\w\\]):(\w+)(?!:)')
+
+
+def _func(name, distinct=False):
+    def aggregate(column):
+        from sqlalchemy import func
+        return getattr(func, name)(column.distinct() if distinct else column)
+
+    return aggregate
+
+
+_AGGREGATES = {
+    'sum': _func('sum'),
+    'count': _func('count'),
+    'count_distinct': _func('count', distinct=True),
+    'nunique': _func('count', distinct=True),
+    'mean': _func('avg'),
+    'avg': _func('avg'),
+    'min': _func('min'),
+    'max': _func('max'),
+}
+
+_OPERATORS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<>': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'like': lambda column, value: column.like(value),
+    'in': None,
+}
+
+SUBQUERY_ALIAS = '_parade_q'
+"""The alias of the wrapped component query."""
+
+
+def _identifier(name):
+    assert isinstance(name, str) and _IDENTIFIER.match(name), 'invalid column name [' + str(name) + '] in pushdown'
+    return name
+
+
+def _is_empty(value):
+    return value is None or value == '' or (isinstance(value, (list, tuple)) and len(value) == 0)
+
+
+class QueryPushdown(object):
+    def __init__(self, spec):
+        assert isinstance(spec, dict), 'invalid pushdown ' + str(spec)
+        self.where = []
+        for column, cond in (spec.get('where') or {}).items():
+            if not isinstance(cond, dict):
+                cond = {'param': cond}
+            op = str(cond.get('op', '=')).lower()
+            assert op in _OPERATORS, 'invalid pushdown operator [' + op + ']'
+            assert cond.get('param'), 'the filter param of column [' + str(column) + '] is required'
+            self.where.append((_identifier(column), op, cond['param']))
+
+        aggregate = spec.get('aggregate') or {}
+        by = aggregate.get('by') or []
+        self.group_by = [_identifier(column) for column in ([by] if isinstance(by, str) else by)]
+        self.aggregates = []
+        for column, func in (aggregate.get('agg') or {}).items():
+            assert func in _AGGREGATES, 'invalid pushdown aggregation [' + str(func) + ']'
+            self.aggregates.append((_identifier(column), func))
+
+        self.sort = []
+        for item in ([spec['sort']] if isinstance(spec.get('sort'), str) else spec.get('sort') or []):
+            parts = item.split()
+            assert len(parts) in (1, 2), 'invalid pushdown sort [' + item + ']'
+            direction = parts[1].upper() if len(parts) == 2 else 'ASC'
+            assert direction in ('ASC', 'DESC'), 'invalid pushdown sort [' + item + ']'
+            self.sort.append((_identifier(parts[0]), direction))
+
+        self.limit = int(spec['limit']) if spec.get('limit') is not None else None
+        if spec.get('top'):
+            top = spec['top']
+            self.sort.insert(0, (_identifier(top['by']), 'DESC'))
+            n = int(top.get('n', 10))
+            self.limit = n if self.limit is None else min(self.limit, n)
+        assert self.limit is None or self.limit >= 0, 'invalid pushdown limit'
+
+    def to_clause(self, query, **kwargs):
+        """
+        compile the pushdown around the query into the sqlalchemy select, the filter values are bound as
+        params, and also bound to the named params of the component query itself
+        :param query: the component query
+        :param kwargs: the filter values
+        :return: the select of the wrapped query
+        """
+        from sqlalchemy import column, literal_column, select, text
+
+        query = query.strip().rstrip(';')
+        query_params = set(_BIND_PARAM.findall(query))
+        inner = text(query).bindparams(**{key: value for key, value in kwargs.items() if key in query_params})
+        referred = {column_name for column_name, _, _ in self.where} | set(self.group_by) | \
+            {column_name for column_name, _ in self.aggregates} | {column_name for column_name, _ in self.sort}
+        # the dialect renders the limit and quotes the identifiers where required
+        wrapped = inner.columns(*[column(column_name) for column_name in sorted(referred)]).subquery(SUBQUERY_ALIAS)
+        columns = wrapped.c
+
+        labels = {}
+        if self.aggregates or self.group_by:
+            for column_name, agg in self.aggregates:
+                labels[column_name] = _AGGREGATES[agg](columns[column_name]).label(column_name)
+            stmt = select(*([columns[column_name] for column_name in self.group_by] + list(labels.values())))
+        else:
+            stmt = select(literal_column('*'))
+        stmt = stmt.select_from(wrapped)
+
+        for column_name, op, param in self.where:
+            value = kwargs.get(param)
+            if _is_empty(value):
+                continue
+            if isinstance(value, (list, tuple)):
+                assert op in ('=', 'in'), 'list value of filter [' + param + '] requires `=` or `in`'
+                stmt = stmt.where(columns[column_name].in_(list(value)))
+            elif op == 'in':
+                stmt = stmt.where(columns[column_name].in_([value]))
+            else:
+                stmt = stmt.where(_OPERATORS[op](columns[column_name], value))
+        if self.group_by:
+            stmt = stmt.group_by(*[columns[column_name] for column_name in self.group_by])
+        for column_name, direction in self.sort:
+            # the aggregated columns are sorted by their labels
+            sorted_column = labels.get(column_name, columns[column_name])
+            stmt = stmt.order_by(sorted_column.desc() if direction == 'DESC' else sorted_column.asc())
+        if self.limit is not None:
+            stmt = stmt.limit(self.limit)
+        return stmt
@@ -0,0 +1,78 @@
+"""
+Per-dashboard scoping of the dash callback graph.
+
+All dashboards register their callbacks on the same dash app, so the server
+dispatches every callback as before, but the ``_dash-dependencies`` payload
+is filtered for the dashboard the client is viewing (resolved from the page
+url in the referrer): only the callbacks with outputs owned by the dashboard,
+plus the callbacks not owned by any dashboard (e.g. the navigation), are
+sent to the browser. The navigation between dashboards stays in the browser,
+and re-fetches the graph scoped to the switched dashboard (see
+``parade.server.dash.layout``).
+"""
+import json
+from urllib.parse import urlparse, unquote
+
+from flask import Response, request
+
+
+def output_ids(output):
+    """
+    get the component ids of the callback output spec
+    :param output: the output spec, `id.prop` or `..id1.prop1...id2.prop2..` for multiple outputs
+    :return: the list of the component ids
+    """
+    if output.startswith('..') and output.endswith('..'):
+        outputs = output[2:-2].split('...')
+    else:
+        outputs = [output]
+    return [item.rsplit('.', 1)[0] for item in outputs]
+
+
+def viewed_dashboard(url_base, referrer):
+    """
+    get the dashboard viewed by the page of the referrer
+    :param url_base: the url base of the dash app
+    :param referrer: the referrer of the request
+    :return: the dashboard name, '' if no dashboard viewed, or None if not resolved
+    """
+    if not referrer:
+        return None
+    path = unquote(urlparse(referrer).path)
+    if not path.startswith(url_base.rstrip('/')):
+        return None
+    return path[len(url_base):].strip('/')
+
+
+def init_callback_scope(app, dashboards):
+    """
+    filter the callback graph sent to the browser by the viewed dashboard
+    :param app: the dash app
+    :param dashboards: the dashboard dict [dashboard name => dashboard]
+    """
+    owners = {}
+    for name, dashboard in dashboards.items():
+        for component_id in dashboard.callback_outputs:
+            owners[component_id] = name
+
+    url_base = app.config.url_base_pathname
+    endpoint = app.config.routes_pathname_prefix + '_dash-dependencies'
+    dependencies = app.server.view_functions[endpoint]
+
+    def scoped_dependencies():
+        response = dependencies()
+        dashboard = viewed_dashboard(url_base, request.referrer)
+        if dashboard is None:
+            # keep the full callback graph if the viewed page is unknown
+            return response
+
+        def in_scope(callback):
+            return all(owners.get(component_id, dashboard) == dashboard
+                       for component_id in output_ids(callback['output']))
+
+        callbacks = [callback for callback in json.loads(response.get_data()) if in_scope(callback)]
+        scoped = Response(json.dumps(callbacks), content_type='application/json')
+        scoped.vary.add('Referer')
+        return scoped
+
+    app.server.view_functions[endpoint] = scoped_dependencies
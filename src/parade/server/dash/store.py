@@ -0,0 +1,103 @@
+"""
+Server-side backend of the ``store`` components of ``subType: server``.
+
+The data of a server store is kept on the server instead of being shipped to
+the browser as records and posted back on every callback reading it. The
+browser store only holds a small handle of the data::
+
+    {"store": "<dashboard>_<component>", "version": "<content hash>"}
+
+The callbacks receiving the handle resolve it back to the DataFrame: from
+the in-process store of the recent frames without any copy, or from the
+shared dashboard cache if the handle was issued by another worker. The data
+is kept per session, so a handle can only be resolved in the session it was
+issued to.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+DEFAULT_MAX_ENTRIES = 64
+"""Default frames kept in the in-process store."""
+
+DEFAULT_TIMEOUT = 600
+"""Default seconds to keep the frames in the shared cache."""
+
+HANDLE_KEYS = {'store', 'version'}
+
+
+def is_handle(value):
+    return isinstance(value, dict) and set(value.keys()) == HANDLE_KEYS
+
+
+def data_version(df):
+    """
+    get the content hash of the frame
+    :param df: the frame
+    :return: the version hash
+    """
+    hashed = pd.util.hash_pandas_object(df, index=True).values
+    digest = hashlib.sha1(hashed.tobytes())
+    digest.update(','.join(str(column) for column in df.columns).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class ServerStore(object):
+    def __init__(self, cache, max_entries=DEFAULT_MAX_ENTRIES, timeout=DEFAULT_TIMEOUT):
+        """
+        :param cache: the shared cache of the dashboard
+        :param max_entries: the frames kept in the process
+        :param timeout: the seconds to keep the frames in the shared cache
+        """
+        self.cache = cache
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._frames = OrderedDict()
+
+    @staticmethod
+    def _cache_key(store_id, version, session_id):
+        return '-'.join(part for part in [store_id, session_id, version, 'store'] if part)
+
+    def _remember(self, key, df):
+        with self._lock:
+            self._frames[key] = df
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_entries:
+                self._frames.popitem(last=False)
+
+    def put(self, store_id, data, session_id=None):
+        """
+        keep the data of the store
+        :param store_id: the id of the store component
+        :param data: the data, converted into a frame if not
+        :param session_id: the session of the data
+        :return: the handle of the data
+        """
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        version = data_version(df)
+        key = self._cache_key(store_id, version, session_id)
+        if key not in self._frames:
+            self.cache.set(key, df, timeout=self.timeout)
+        self._remember(key, df)
+        return {'store': store_id, 'version': version}
+
+    def resolve(self, handle, session_id=None):
+        """
+        resolve the handle back to the frame, the frame is shared and should not be modified in place
+        :param handle: the handle of the data
+        :param session_id: the session resolving the handle
+        :return: the frame, or None if expired
+        """
+        key = self._cache_key(handle['store'], handle['version'], session_id)
+        with self._lock:
+            df = self._frames.get(key)
+            if df is not None:
+                self._frames.move_to_end(key)
+                return df
+        df = self.cache.get(key)
+        if df is not None:
+            self._remember(key, df)
+        return df
@@ -0,0 +1,148 @@
+"""
+Supersession of the in-flight component callbacks.
+
+Dragging a slider or clicking through the options of a filter fires a
+callback for every intermediate value, while only the last result is shown.
+The callbacks of a subscribed component are tracked per page, identified by
+the ``<dashboard>_page-id`` generated with every rendered layout and sent as
+the last state of the callbacks: starting a newer callback cancels the older
+one in flight of the same page (and session), which is abandoned at its next
+checkpoint (after the debounce wait, after the data loading) and has its
+running query cancelled where the database driver supports it (see
+``parade.server.cancel``). The pages of other tabs are tracked apart. The
+browser reports the page it leaves (closed, reloaded or switched to another
+dashboard) with a beacon, and the callbacks in flight of the page are
+cancelled the same way.
+
+The filters can set a ``debounce`` (milliseconds): the callbacks of the
+components subscribing the filter wait for the debounce before loading, so
+the values superseded within the debounce never load. The sliders with a
+debounce also update while dragging (``updatemode: drag``), unless the
+``updatemode`` is set explicitly.
+"""
+import threading
+
+from dash.exceptions import PreventUpdate
+from flask import Response, request
+
+from ..cancel import CancelToken, activate
+from ..metrics import registry
+
+ABANDON_ROUTE = '_parade-abandon'
+"""The route (under the dash url base) the browsers report the pages left to."""
+
+superseded_total = registry.counter('parade_dash_superseded_total', 'Component callbacks superseded by newer ones',
+                                    ('dashboard', 'component'))
+abandoned_total = registry.counter('parade_dash_abandoned_total', 'Component callbacks of the pages left',
+                                   ('dashboard', 'component'))
+
+
+def debounce_of(component):
+    """
+    get the debounce of the filter
+    :param component: the filter component
+    :return: the debounce in milliseconds, 0 if not set
+    """
+    debounce = component.get('debounce')
+    if isinstance(debounce, bool) or not isinstance(debounce, (int, float)):
+        return 0
+    return max(0, debounce)
+
+
+class Supersession(object):
+    def __init__(self, name):
+        """
+        :param name: the dashboard name
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._latest = {}
+
+    def begin(self, key):
+        """
+        begin the callback of the key, the older one in flight is cancelled
+        :param key: the key of (component, session, page)
+        :return: the cancel token of the callback
+        """
+        token = CancelToken()
+        with self._lock:
+            previous = self._latest.get(key)
+            self._latest[key] = token
+        if previous is not None:
+            superseded_total.inc(self.name, key[0])
+            previous.cancel()
+        return token
+
+    def finish(self, key, token):
+        with self._lock:
+            if self._latest.get(key) is token:
+                del self._latest[key]
+
+    def abandon(self, session_id, page_id):
+        """
+        cancel the callbacks in flight of the page left
+        :param session_id: the session of the page
+        :param page_id: the page id
+        """
+        with self._lock:
+            keys = [key for key in self._latest if key[1:] == (session_id, page_id)]
+            tokens = [self._latest.pop(key) for key in keys]
+        for key, token in zip(keys, tokens):
+            abandoned_total.inc(self.name, key[0])
+            token.cancel()
+
+    def wrap(self, comp_key, func, session_func, debounce=0):
+        """
+        track the callbacks of the component per page, the page id is the last argument of the callback
+        :param comp_key: the component key
+        :param func: the callback function, called without the page id
+        :param session_func: the function to get the session of the callback
+        :param debounce: the milliseconds to wait before running the callback
+        :return: the tracked callback function
+        """
+
+        def tracked(*args):
+            args, page_id = args[:-1], args[-1]
+            if page_id is None:
+                # the pages without the page id, e.g. rendered before the upgrade
+                return func(*args)
+            key = (comp_key, session_func(), page_id)
+            token = self.begin(key)
+            try:
+                if debounce and token.wait(debounce / 1000):
+                    raise PreventUpdate
+                with activate(token):
+                    result = func(*args)
+                if token.cancelled:
+                    raise PreventUpdate
+                return result
+            except PreventUpdate:
+                raise
+            except Exception:
+                # the failures of the interrupted work, e.g. the cancelled query
+                if token.cancelled:
+                    raise PreventUpdate
+                raise
+            finally:
+                self.finish(key, token)
+
+        return tracked
+
+
+def init_abandon_route(app, dashboards):
+    """
+    cancel the callbacks in flight of the pages reported left by the browsers
+    :param app: the dash app
+    :param dashboards: the dashboard dict [dashboard name => dashboard]
+    """
+
+    def abandon_page():
+        page_id = request.get_data(as_text=True)
+        if page_id:
+            for dashboard in dashboards.values():
+                if hasattr(dashboard, 'abandon_page'):
+                    dashboard.abandon_page(page_id)
+        return Response(status=204)
+
+    route = app.config.url_base_pathname + ABANDON_ROUTE
+    app.server.add_url_rule(route, endpoint=route, view_func=abandon_page, methods=['POST'])
@@ -0,0 +1,110 @@
+"""
+Downsampling of the plotted series to bound the figure payload.
+
+Both algorithms return the sorted positions of the kept points, so they can be
+applied to the x values and every other aligned array of the series.
+"""
+import numpy as np
+import pandas as pd
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+"""Supported downsampling methods."""
+
+
+def _numeric_x(x):
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.to_numpy(dtype='datetime64[ns]').astype('int64').astype(float)
+    if pd.api.types.is_numeric_dtype(x):
+        return x.to_numpy(dtype=float)
+    return np.arange(len(x), dtype=float)
+
+
+def lttb_indices(x, y, n_out):
+    """Select points with the Largest-Triangle-Three-Buckets algorithm.
+
+    Args:
+        x: numeric x values in ascending order
+        y: numeric y values
+        n_out: number of points to keep
+
+    Returns:
+        array: positions of the kept points
+
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        # too few points for a bucket, keep the first (and the last)
+        return np.linspace(0, n - 1, n_out).astype(int)
+
+    # the first and last points are always kept, the rest are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        areas = np.abs((x[prev] - avg_x) * (y[start:end] - y[prev]) - (x[prev] - x[start:end]) * (avg_y - y[prev]))
+        prev = start + int(np.argmax(areas))
+        kept[i + 1] = prev
+    return kept
+
+
+def minmax_indices(y, n_out):
+    """Select the minimum and maximum points of equal-size buckets.
+
+    Args:
+        y: numeric y values
+        n_out: number of points to keep, two per bucket
+
+    Returns:
+        array: positions of the kept points
+
+    """
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n:
+        return np.arange(n)
+    if n_buckets < 1:
+        return np.array([int(np.argmax(y))])
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    kept = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            bucket = y[start:end]
+            kept.extend((start + int(np.argmin(bucket)), start + int(np.argmax(bucket))))
+    return np.unique(kept)
+
+
+def downsample(x, y, max_points, method='lttb'):
+    """Downsample the series to at most `max_points` points.
+
+    Args:
+        x: x values of the series, numeric, datetime or categorical
+        y: numeric y values of the series
+        max_points: maximum number of points to keep
+        method: `lttb` or `minmax`
+
+    Returns:
+        tuple: the downsampled x and y values
+
+    """
+    assert method in DOWNSAMPLE_METHODS, 'invalid downsample method ' + str(method)
+    max_points = int(max_points)
+    assert max_points > 0, 'max_points must be positive'
+    if len(y) <= max_points:
+        return x, y
+
+    y_values = pd.Series(y).to_numpy(dtype=float)
+    if method == 'lttb':
+        kept = lttb_indices(_numeric_x(x), y_values, max_points)
+    else:
+        kept = minmax_indices(y_values, max_points)
+    return pd.Series(x).iloc[kept], pd.Series(y).iloc[kept]
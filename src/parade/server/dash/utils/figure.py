@@ -0,0 +1,75 @@
+"""
+Compact serialization of the chart figures sent in the Dash callback responses.
+
+The numeric arrays of the traces can be rounded to a reduced float precision
+and/or encoded as plotly.js typed arrays (base64 ``bdata``, supported since
+plotly.js 2.28), which are much smaller than the default decimal lists.
+"""
+import base64
+
+import numpy as np
+import pandas as pd
+
+COMPACT_MIN_SIZE = 64
+"""Minimum length of the numeric arrays to encode compactly."""
+
+_TYPED_ARRAY_DTYPES = {'i1', 'u1', 'i2', 'u2', 'i4', 'u4', 'f4', 'f8'}
+
+
+def _as_numeric_array(value):
+    if isinstance(value, (pd.Series, pd.Index)):
+        value = value.to_numpy()
+    elif isinstance(value, (list, tuple)):
+        if len(value) < COMPACT_MIN_SIZE or not all(isinstance(v, (int, float)) for v in value[:COMPACT_MIN_SIZE]):
+            return None
+        value = np.asarray(value)
+    if not isinstance(value, np.ndarray) or value.size < COMPACT_MIN_SIZE or value.dtype.kind not in 'iuf':
+        return None
+    return value
+
+
+def _typed_array(arr, single_precision):
+    if arr.dtype.kind == 'f':
+        arr = arr.astype('<f4' if single_precision else '<f8')
+    else:
+        # int64 is not a plotly.js typed array type, narrow it if possible
+        dtype = arr.dtype.kind + str(min(arr.dtype.itemsize, 4))
+        if arr.dtype.itemsize > 4 and (arr.min() < np.iinfo(dtype).min or arr.max() > np.iinfo(dtype).max):
+            dtype = 'f8'
+        arr = arr.astype('<' + dtype)
+    assert arr.dtype.str[1:] in _TYPED_ARRAY_DTYPES, 'unsupported typed array ' + arr.dtype.str
+    encoded = {'dtype': arr.dtype.str[1:], 'bdata': base64.b64encode(np.ascontiguousarray(arr).tobytes()).decode()}
+    if arr.ndim > 1:
+        encoded['shape'] = ','.join(str(d) for d in arr.shape)
+    return encoded
+
+
+def _compact_value(value, precision, binary):
+    if isinstance(value, dict):
+        return {k: _compact_value(v, precision, binary) for k, v in value.items()}
+    arr = _as_numeric_array(value)
+    if arr is None:
+        return value
+    if precision is not None and arr.dtype.kind == 'f':
+        arr = np.round(arr, precision)
+    if binary:
+        # the rounded floats are kept in single precision
+        return _typed_array(arr, single_precision=precision is not None and precision <= 6)
+    return arr.tolist()
+
+
+def compact_figure(figure, precision=None, binary=False):
+    """
+    convert the figure into the plain dict with compactly encoded numeric arrays
+    :param figure: the plotly figure or the figure dict with `data` and `layout`
+    :param precision: the number of decimals to keep in the float arrays, no rounding if not provided
+    :param binary: encode the numeric arrays as plotly.js typed arrays
+    :return: the figure dict
+    """
+    if precision is None and not binary:
+        return figure
+    fig_dict = figure.to_plotly_json() if hasattr(figure, 'to_plotly_json') else dict(figure)
+    data = [trace.to_plotly_json() if hasattr(trace, 'to_plotly_json') else trace
+            for trace in fig_dict.get('data', [])]
+    fig_dict['data'] = [_compact_value(trace, precision, binary) for trace in data]
+    return fig_dict
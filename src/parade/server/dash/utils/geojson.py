@@ -0,0 +1,157 @@
+"""
+GeoJSON asset cache for the map charts.
+
+The GeoJSON resources are loaded (and optionally simplified) once per path
+and modification time, and are served as immutable static assets, so the
+figures only reference the asset url instead of embedding the geometry in
+every callback response. The remote resources have no modification time and
+are reloaded every ``dash.geojson.ttl`` seconds (an hour by default), and
+are read with a timeout of ``dash.geojson.timeout`` seconds.
+
+The assets are served behind the same login as the dashboards, and are only
+cached privately by the browsers. The assets are kept in the memory of the
+process which rendered the figure, so the asset urls require the server to
+run in a single process (or the browsers to stick to the same worker). The
+multi-process deployments embed the geometry into the figures instead::
+
+    dash:
+      geojson:
+        embed: true
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from flask import Blueprint, Response, request
+
+GEOJSON_URL_PREFIX = '/dash-assets/geojson/'
+"""Url prefix of the served GeoJSON assets."""
+
+DEFAULT_REMOTE_TTL = 3600
+"""Default seconds to keep the remote GeoJSON resources before reloading."""
+
+DEFAULT_REMOTE_TIMEOUT = 30
+"""Default seconds to wait for the remote GeoJSON resources."""
+
+bp = Blueprint('geojson', __name__)
+
+_lock = threading.Lock()
+_geojson_cache = {}
+_geojson_assets = {}
+
+
+class GeoJSONAsset(object):
+    def __init__(self, geojson, content):
+        self.geojson = geojson
+        self.content = content
+        self.key = hashlib.sha1(content).hexdigest()
+
+    @property
+    def url(self):
+        return GEOJSON_URL_PREFIX + self.key + '.json'
+
+
+def _resolve_path(context, path):
+    """
+    resolve the path and the version of the GeoJSON resource
+    :return: the tuple of the path and the version, the modification time of the files
+    or the ttl period of the urls
+    """
+    if '://' in path:
+        ttl = int(context.conf.get_or_else('dash.geojson.ttl', DEFAULT_REMOTE_TTL))
+        return path, int(time.time() // max(ttl, 1))
+    if not os.path.isabs(path):
+        path = os.path.join(context.workdir, path)
+    return path, os.path.getmtime(path)
+
+
+def _read_geojson(path, timeout=DEFAULT_REMOTE_TIMEOUT):
+    if '://' in path:
+        from urllib.request import urlopen
+        f = urlopen(path, timeout=timeout)
+    else:
+        f = open(path, 'r')
+    try:
+        return json.load(f)
+    finally:
+        f.close()
+
+
+def _round_coords(coords, precision):
+    if coords and isinstance(coords[0], (int, float)):
+        return [round(c, precision) for c in coords]
+    return [_round_coords(c, precision) for c in coords]
+
+
+def simplify_geojson(geojson, tolerance=None, precision=None):
+    """
+    simplify the geometries of the GeoJSON feature collection
+    :param geojson: the GeoJSON feature collection
+    :param tolerance: the simplification tolerance in coordinate units, requires *shapely*
+    :param precision: the number of decimals to keep in coordinates
+    :return: the simplified GeoJSON feature collection
+    """
+    if tolerance:
+        from shapely.geometry import shape, mapping
+
+    features = []
+    for feature in geojson.get('features', []):
+        geometry = feature.get('geometry')
+        if geometry:
+            if tolerance:
+                geometry = mapping(shape(geometry).simplify(float(tolerance), preserve_topology=True))
+            if precision is not None:
+                geometry = dict(geometry, coordinates=_round_coords(geometry['coordinates'], int(precision)))
+        features.append(dict(feature, geometry=geometry))
+    return dict(geojson, features=features)
+
+
+def load_geojson(context, path, tolerance=None, precision=None):
+    """
+    load the GeoJSON resource as a cached asset
+    :param context: the parade context
+    :param path: the url or the file path (relative to workdir) of the GeoJSON
+    :param tolerance: the simplification tolerance, no simplification if not provided
+    :param precision: the number of decimals to keep in coordinates
+    :return: the loaded GeoJSON asset
+    """
+    path, version = _resolve_path(context, path)
+    cache_key = (path, version, tolerance, precision)
+    with _lock:
+        asset = _geojson_cache.get(cache_key)
+    if asset is not None:
+        return asset
+
+    # the resource is read and simplified without the lock, not to block the other renders
+    geojson = _read_geojson(path, timeout=float(context.conf.get_or_else('dash.geojson.timeout',
+                                                                         DEFAULT_REMOTE_TIMEOUT)))
+    if tolerance or precision is not None:
+        geojson = simplify_geojson(geojson, tolerance=tolerance, precision=precision)
+    asset = GeoJSONAsset(geojson, json.dumps(geojson, separators=(',', ':')).encode('utf-8'))
+    with _lock:
+        # the same resource loaded by another render meanwhile
+        if cache_key in _geojson_cache:
+            return _geojson_cache[cache_key]
+        # drop the stale versions of the same resource
+        for stale_key in [k for k in _geojson_cache if k[0] == path and k[1] != version]:
+            _geojson_assets.pop(_geojson_cache.pop(stale_key).key, None)
+        _geojson_cache[cache_key] = asset
+        _geojson_assets[asset.key] = asset
+    return asset
+
+
+@bp.route(GEOJSON_URL_PREFIX + '<asset_key>.json')
+def serve_geojson(asset_key):
+    asset = _geojson_assets.get(asset_key)
+    if not asset:
+        return Response('GeoJSON asset not found', 404)
+    if asset.key in request.if_none_match:
+        return Response(status=304)
+    response = Response(asset.content, mimetype='application/json')
+    response.set_etag(asset.key)
+    # the assets are served to the logged-in users only
+    response.cache_control.private = True
+    response.cache_control.max_age = 365 * 24 * 3600
+    return response
@@ -0,0 +1,184 @@
+"""
+Scheduled cache warming of the subscribed dashboard components.
+
+The ``warmup`` section of a dashboard lists the jobs pre-executing the
+component loads for the common filter values into the shared dashboard
+cache, so the first users of the day do not pay for the cold queries::
+
+    warmup:
+      - cron: "30 7 * * 1-5"        # minute hour day month weekday, or `at: "07:30"` daily
+        components: [sales, gmv]     # all subscribed components by default
+        timeout: 86400               # seconds to keep the warmed data
+        filters:
+          - {start_date: "{today-7d}", end_date: "{today}"}
+          - {start_date: "{month_start}", end_date: "{today}"}
+
+The filter sets are keyed by the ``as`` names of the subscriptions, and the
+values can use the date templates ``{today}``, ``{now}``, ``{week_start}``,
+``{month_start}`` and ``{year_start}`` with an optional offset of days or
+weeks and a strftime format, e.g. ``{today-1d:%Y%m%d}``. A component is only
+warmed for the filter sets covering all its inputs, the coverage and the
+duration of every run are exported with the server metrics. The failed loads
+are logged and left out of the coverage.
+
+The scheduler runs in every server process creating the dashboards, except
+the reloader process of the development server. The multi-process
+deployments keep the warming on a single process by disabling it on the
+others with ``dash.warmup.enabled: false``.
+"""
+import datetime
+import logging
+import re
+import threading
+import time
+
+from ..metrics import registry
+
+DEFAULT_TIMEOUT = 86400
+"""Default seconds to keep the warmed data."""
+
+logger = logging.getLogger('Parade.Dash')
+
+warmup_seconds = registry.histogram('parade_dash_warmup_seconds', 'Duration of the cache warming runs',
+                                    ('dashboard',), buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800))
+warmup_coverage = registry.gauge('parade_dash_warmup_coverage',
+                                 'Ratio of the component loads warmed by the last run', ('dashboard',))
+warm_total = registry.counter('parade_dash_warm_total', 'Lookups of the warmed component data',
+                              ('dashboard', 'component', 'result'))
+
+_CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+_TEMPLATE = re.compile(r'\{(today|now|week_start|month_start|year_start)(?:([+-]\d+)([dw]))?(?::([^}]*))?\}')
+
+
+def _parse_cron_field(field, low, high):
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step = part.split('/')
+            step = int(step)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-'))
+        else:
+            start = end = int(part)
+        assert low <= start <= end <= high and step > 0, 'invalid cron field [' + field + ']'
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule(object):
+    def __init__(self, expr):
+        fields = expr.split()
+        assert len(fields) == 5, 'invalid cron [' + expr + '], 5 fields required'
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, weekdays = \
+            [_parse_cron_field(field, low, high) for field, (low, high) in zip(fields, _CRON_RANGES)]
+        # both 0 and 7 are sunday
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def matches(self, now):
+        if now.minute not in self.minutes or now.hour not in self.hours or now.month not in self.months:
+            return False
+        day_matched = now.day in self.days
+        weekday_matched = (now.weekday() + 1) % 7 in self.weekdays
+        # the day and weekday are matched in either if both restricted, as the cron does
+        if self.any_day or self.any_weekday:
+            return day_matched and weekday_matched
+        return day_matched or weekday_matched
+
+
+def _render_template(match, now):
+    anchor, offset, unit, fmt = match.groups()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    value = {
+        'today': today,
+        'now': now,
+        'week_start': today - datetime.timedelta(days=today.weekday()),
+        'month_start': today.replace(day=1),
+        'year_start': today.replace(month=1, day=1),
+    }[anchor]
+    if offset:
+        value += datetime.timedelta(days=int(offset) * (7 if unit == 'w' else 1))
+    return value.strftime(fmt or ('%Y-%m-%d %H:%M:%S' if anchor == 'now' else '%Y-%m-%d'))
+
+
+def render_filters(values, now):
+    """
+    render the date templates in the filter values
+    :param values: the filter values, a str, a list or the dict of them
+    :param now: the time of the rendering
+    :return: the rendered values
+    """
+    if isinstance(values, dict):
+        return {key: render_filters(value, now) for key, value in values.items()}
+    if isinstance(values, list):
+        return [render_filters(value, now) for value in values]
+    if isinstance(values, str):
+        return _TEMPLATE.sub(lambda match: _render_template(match, now), values)
+    return values
+
+
+class WarmupJob(object):
+    def __init__(self, spec):
+        assert isinstance(spec, dict), 'invalid warmup ' + str(spec)
+        assert 'cron' in spec or 'at' in spec, 'the cron or at of warmup is *REQUIRED*'
+        if 'cron' in spec:
+            self.schedule = CronSchedule(spec['cron'])
+        else:
+            hour, minute = str(spec['at']).split(':')
+            self.schedule = CronSchedule('{} {} * * *'.format(int(minute), int(hour)))
+        self.components = spec.get('components')
+        self.filters = spec.get('filters') or [{}]
+        assert all(isinstance(values, dict) for values in self.filters), 'invalid warmup filters'
+        self.timeout = int(spec.get('timeout', DEFAULT_TIMEOUT))
+        self.last_run = None
+
+    def due(self, now):
+        minute = now.replace(second=0, microsecond=0)
+        if minute == self.last_run or not self.schedule.matches(now):
+            return False
+        self.last_run = minute
+        return True
+
+
+class WarmupScheduler(threading.Thread):
+    """
+    run the due warmup jobs of the dashboards every minute
+    """
+
+    def __init__(self, dashboards):
+        threading.Thread.__init__(self, name='parade-warmup', daemon=True)
+        self.dashboards = dashboards
+
+    def run_due(self, now):
+        for dashboard in self.dashboards.values():
+            for job in getattr(dashboard, 'warmups', []):
+                if not job.due(now):
+                    continue
+                try:
+                    dashboard.warm_up(job, now)
+                except Exception:
+                    logger.exception('cache warming of dashboard [%s] failed', dashboard.name)
+
+    def run(self):
+        while True:
+            self.run_due(datetime.datetime.now())
+            time.sleep(60 - time.time() % 60)
+
+
+def init_warmup(dashboards):
+    """
+    start the scheduler of the cache warming if any dashboard configured
+    :param dashboards: the dashboard dict [dashboard name => dashboard]
+    :return: the started scheduler, or None if no warmup configured
+    """
+    if not any(getattr(dashboard, 'warmups', None) for dashboard in dashboards.values()):
+        return None
+    scheduler = WarmupScheduler(dashboards)
+    scheduler.start()
+    return scheduler
@@ -0,0 +1,188 @@
+# -*- coding:utf-8 -*-
+"""
+In-process metrics of the parade server, exported in the Prometheus text
+format through the ``/metrics`` endpoint.
+
+The metrics are kept per label values in plain dicts guarded by a lock, so
+they are cheap enough to leave on in production.
+
+The metrics name the dashboards, components and tasks, so the endpoint is
+restricted like the profiling endpoints: it is open to the admin users, to
+the scrapers sending the ``metrics.token`` as a bearer token and to the
+addresses listed in ``metrics.allow``. Without the auth, the tokens and the
+allowed addresses, it is only open in debug mode.
+"""
+import hmac
+import threading
+
+from flask import Blueprint, Response, current_app, request
+
+DEFAULT_TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+"""Default histogram buckets (seconds) of the timings."""
+
+DEFAULT_SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000, 100000000)
+"""Default histogram buckets of the sizes (rows, bytes)."""
+
+bp = Blueprint('metrics', __name__)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(k, _escape(v)) for k, v in pairs) + '}'
+
+
+class Metric(object):
+    type = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        assert len(labels) == len(self.label_names), 'invalid labels of metric ' + self.name
+        return tuple(labels)
+
+    def samples(self):
+        """
+        get the samples of the metric
+        :return: the list of (suffix, label values, extra label, value)
+        """
+        raise NotImplementedError
+
+    def render(self):
+        lines = ['# HELP {} {}'.format(self.name, self.documentation), '# TYPE {} {}'.format(self.name, self.type)]
+        for suffix, labels, extra, value in self.samples():
+            lines.append('{}{}{} {}'.format(self.name, suffix, _format_labels(self.label_names, labels, extra),
+                                            repr(float(value))))
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [('', key, None, value) for key, value in self._values.items()]
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        with self._lock:
+            return [('', key, None, value) for key, value in self._values.items()]
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_TIME_BUCKETS):
+        Metric.__init__(self, name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        key = self._key(labels)
+        with self._lock:
+            # counts of the buckets, the sum and the count of observations
+            entry = self._values.setdefault(key, [[0] * len(self.buckets), 0, 0])
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][idx] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    samples.append(('_bucket', key, ('le', repr(float(bound))), cumulative))
+                samples.append(('_bucket', key, ('le', '+Inf'), count))
+                samples.append(('_sum', key, None, total))
+                samples.append(('_count', key, None, count))
+        return samples
+
+
+class MetricsRegistry(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name not in self._metrics:
+                self._metrics[metric.name] = metric
+            registered = self._metrics[metric.name]
+        assert type(registered) == type(metric) and registered.label_names == metric.label_names, \
+            'metric ' + metric.name + ' registered with different type or labels'
+        return registered
+
+    def counter(self, name, documentation, label_names=()):
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name, documentation, label_names=()):
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_TIME_BUCKETS):
+        return self._register(Histogram(name, documentation, label_names, buckets=buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+registry = MetricsRegistry()
+"""The metrics registry of the parade server."""
+
+
+def _is_allowed():
+    conf = current_app.parade_context.conf
+    token = conf.get_or_else('metrics.token', None)
+    # compared as bytes, the non-ascii headers are not comparable as str
+    if token and hmac.compare_digest(request.headers.get('Authorization', '').encode('utf-8'),
+                                     ('Bearer ' + str(token)).encode('utf-8')):
+        return True
+    if request.remote_addr in conf.get_or_else('metrics.allow', []):
+        return True
+    from .auth import is_admin
+    return is_admin()
+
+
+@bp.route('/metrics')
+def export_metrics():
+    if not _is_allowed():
+        return Response('Metrics token or admin privilege required', 403)
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,233 @@
+# -*- coding:utf-8 -*-
+"""
+Server-managed pools and concurrency limits of the configured connections.
+
+The queries of the dashboards, the data api and the tasks executed by the
+server all go through ``context.load_query`` / ``context.load``, which are
+limited per connection by a semaphore: at most ``maxConcurrency`` queries
+run on a connection at the same time, the others wait for ``timeout``
+seconds and then fail with a 503. The sqlalchemy engines opened by the
+datasources are kept in a pool per connection and database instead of being
+created per query, with the configured sizes, checkout timeout and the
+health check of the pooled connections before use::
+
+    pool:
+      maxConcurrency: 8         # the defaults of all connections
+      dw:
+        minSize: 2
+        maxSize: 10
+        timeout: 30
+        recycle: 300
+        healthCheck: true
+        maxConcurrency: 4
+
+The pool usage is exported with the server metrics.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from parade.error import ParadeError
+from .metrics import registry
+
+DEFAULT_MIN_SIZE = 2
+"""Default pooled connections kept open per connection and database."""
+
+DEFAULT_MAX_SIZE = 10
+"""Default maximum connections opened per connection and database."""
+
+DEFAULT_TIMEOUT = 30
+"""Default seconds to wait for a query slot or a pooled connection."""
+
+DEFAULT_RECYCLE = 300
+"""Default seconds before a pooled connection is reopened."""
+
+pool_in_use = registry.gauge('parade_pool_queries_in_use', 'Queries running on the connection', ('conn',))
+pool_waiting = registry.gauge('parade_pool_queries_waiting', 'Queries waiting for a slot of the connection',
+                              ('conn',))
+pool_wait_seconds = registry.histogram('parade_pool_wait_seconds', 'Time waited for a slot of the connection',
+                                       ('conn',))
+pool_timeouts = registry.counter('parade_pool_timeouts_total', 'Queries timed out waiting for the connection',
+                                 ('conn',))
+pool_checked_out = registry.gauge('parade_pool_connections_checked_out', 'Pooled connections checked out',
+                                  ('conn',))
+pool_size = registry.gauge('parade_pool_connections_open', 'Pooled connections opened', ('conn',))
+
+
+class ConnectionBusyError(ParadeError):
+    code = 300
+    status = 503
+    message = 'connection [{conn}] is busy, no query slot available in {timeout}s'
+
+
+class ConnectionPool(object):
+    """
+    The query slots of one connection, and the pooled engines of its datasource by database.
+    """
+
+    def __init__(self, conn, min_size=DEFAULT_MIN_SIZE, max_size=DEFAULT_MAX_SIZE, timeout=DEFAULT_TIMEOUT,
+                 recycle=DEFAULT_RECYCLE, health_check=True, max_concurrency=None):
+        assert 0 <= min_size <= max_size, 'invalid pool size of connection ' + conn
+        self.conn = conn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.health_check = health_check
+        self.max_concurrency = max_concurrency or max_size
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._engines = {}
+
+    @contextmanager
+    def slot(self):
+        """
+        hold a query slot of the connection
+        """
+        start = time.perf_counter()
+        pool_waiting.inc(self.conn)
+        try:
+            acquired = self._slots.acquire(timeout=self.timeout)
+        finally:
+            pool_waiting.dec(self.conn)
+        pool_wait_seconds.observe(time.perf_counter() - start, self.conn)
+        if not acquired:
+            pool_timeouts.inc(self.conn)
+            raise ConnectionBusyError(conn=self.conn, timeout=self.timeout)
+
+        pool_in_use.inc(self.conn)
+        try:
+            yield
+        finally:
+            pool_in_use.dec(self.conn)
+            self._slots.release()
+            self.record_usage()
+
+    def engine(self, db, opener):
+        """
+        get the pooled engine of the database
+        :param db: the database
+        :param opener: the original open function of the datasource
+        :return: the engine, or the opened object if not a sqlalchemy engine
+        """
+        with self._lock:
+            if db not in self._engines:
+                opened = opener(db)
+                self._engines[db] = self._pooled(opened)
+            return self._engines[db]
+
+    def _pooled(self, opened):
+        from sqlalchemy.engine import Engine
+        from sqlalchemy.pool import QueuePool
+        from .cancel import instrument_engine
+        if not isinstance(opened, Engine):
+            return opened
+        # the other pools are kept as opened, e.g. the sqlite engines without the sizing of the pool
+        if isinstance(opened.pool, QueuePool):
+            # the pool is replaced in the opened engine, as `Pool.recreate` does, to keep the url,
+            # the connect args and the engine options of the datasource
+            pool = opened.pool
+            opened.pool = QueuePool(pool._creator, pool_size=self.min_size, max_overflow=self.max_size - self.min_size,
+                                    timeout=self.timeout, recycle=self.recycle, pre_ping=self.health_check,
+                                    echo=pool.echo, logging_name=pool._orig_logging_name,
+                                    reset_on_return=pool._reset_on_return, _dispatch=pool.dispatch,
+                                    dialect=pool._dialect)
+            pool.dispose()
+        # the queries of the cancelled callbacks are cancelled on the database
+        instrument_engine(opened)
+        return opened
+
+    def record_usage(self):
+        with self._lock:
+            engines = list(self._engines.values())
+        pools = [engine.pool for engine in engines if hasattr(getattr(engine, 'pool', None), 'checkedout')]
+        if pools:
+            pool_checked_out.set(self.conn, value=sum(pool.checkedout() for pool in pools))
+            pool_size.set(self.conn, value=sum(pool.checkedout() + pool.checkedin() for pool in pools))
+
+    def dispose(self):
+        with self._lock:
+            for engine in self._engines.values():
+                if hasattr(engine, 'dispose'):
+                    engine.dispose()
+            self._engines.clear()
+
+
+class PoolManager(object):
+    def __init__(self, context):
+        self.context = context
+        self._lock = threading.Lock()
+        self._pools = {}
+
+    def _conf(self, conn, key, default):
+        return self.context.conf.get_or_else('pool.' + conn + '.' + key,
+                                             self.context.conf.get_or_else('pool.' + key, default))
+
+    def get_pool(self, conn):
+        with self._lock:
+            if conn not in self._pools:
+                pool = ConnectionPool(conn, min_size=int(self._conf(conn, 'minSize', DEFAULT_MIN_SIZE)),
+                                      max_size=int(self._conf(conn, 'maxSize', DEFAULT_MAX_SIZE)),
+                                      timeout=float(self._conf(conn, 'timeout', DEFAULT_TIMEOUT)),
+                                      recycle=int(self._conf(conn, 'recycle', DEFAULT_RECYCLE)),
+                                      health_check=str(self._conf(conn, 'healthCheck', True)).lower() == 'true',
+                                      max_concurrency=self._conf(conn, 'maxConcurrency', None))
+                self._install(conn, pool)
+                self._pools[conn] = pool
+            return self._pools[conn]
+
+    def _install(self, conn, pool):
+        """
+        open the engines of the connection datasource from the pool
+        """
+        try:
+            datasource = self.context.get_connection(conn).datasource
+        except Exception:
+            return
+        opener = getattr(datasource, 'open', None)
+        if opener is None or getattr(opener, 'pooled', False):
+            return
+
+        def pooled_open(db):
+            return pool.engine(db, opener)
+
+        pooled_open.pooled = True
+        datasource.open = pooled_open
+
+    @contextmanager
+    def slot(self, conn):
+        if not conn:
+            yield
+            return
+        with self.get_pool(conn).slot():
+            yield
+
+    def dispose(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool.dispose()
+
+
+def init_pools(app, context):
+    """
+    limit the queries of the context per connection and pool the connection engines
+    :param app: the flask app
+    :param context: the parade context
+    """
+    manager = PoolManager(context)
+    load_query = context.load_query
+    # the contexts without the table loading, e.g. the synthetic context of the benchmarks
+    load = getattr(context, 'load', None)
+
+    def pooled_load_query(query, conn=None, **kwargs):
+        with manager.slot(conn):
+            return load_query(query, conn=conn, **kwargs)
+
+    def pooled_load(table, conn=None, **kwargs):
+        with manager.slot(conn):
+            return load(table, conn=conn, **kwargs)
+
+    context.load_query = pooled_load_query
+    if load is not None:
+        context.load = pooled_load
+    app.pool_manager = manager
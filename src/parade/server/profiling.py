@@ -0,0 +1,223 @@
+# -*- coding:utf-8 -*-
+"""
+On-demand profiling of the live parade server, restricted to admin users. The
+admins are opted in by their user ids (none by default)::
+
+    auth:
+      admins: [parade]
+
+* The sampling profiler samples the stacks of all threads of the process for
+  N seconds, and reports them in the folded format of flamegraph.pl /
+  speedscope::
+
+    POST /admin/profile/sampler?seconds=30&interval=0.01
+    GET  /admin/profile/sampler
+
+* A single request is profiled with cProfile when requested with the
+  ``__profile`` query argument. ``__profile=1`` returns the report in place of
+  the response, ``__profile=store`` stores the report (a pstats dump) in the
+  ``profile`` directory of the workspace and names it in the
+  ``X-Parade-Profile`` header. The dash callbacks are profiled when the
+  dashboard page is opened with the ``__profile`` argument, and their reports
+  are always stored.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from urllib.parse import urlparse, parse_qs
+
+from flask import Blueprint, Response, current_app, g, jsonify, request, send_from_directory
+
+from .auth import is_admin
+
+PROFILE_DIR = 'profile'
+"""The directory (relative to the workdir) to store the request profile reports."""
+
+MAX_SAMPLE_SECONDS = 300
+"""The longest duration of the sampling profiler."""
+
+bp = Blueprint('profiling', __name__, url_prefix='/admin/profile')
+
+
+class SamplingProfiler(object):
+    """Sample the stacks of all threads at a fixed interval."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stacks = Counter()
+        self.samples = 0
+        self.started = None
+        self.until = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds, interval=0.01):
+        """
+        start sampling in a background thread
+        :param seconds: the sampling duration
+        :param interval: the sampling interval in seconds
+        :return: False if the profiler is already running
+        """
+        with self._lock:
+            if self.running:
+                return False
+            self.stacks = Counter()
+            self.samples = 0
+            self.started = time.time()
+            self.until = self.started + seconds
+            self._thread = threading.Thread(target=self._run, args=(interval,), name='parade-sampler', daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self, interval):
+        sampler_id = threading.get_ident()
+        while time.time() < self.until:
+            thread_names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append('{} ({}:{})'.format(code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+            time.sleep(interval)
+
+    def folded(self):
+        """
+        get the sampled stacks in the folded format
+        :return: the lines of `frame;frame;frame count`
+        """
+        return '\n'.join('{} {}'.format(stack, count) for stack, count in self.stacks.most_common()) + '\n'
+
+
+sampler = SamplingProfiler()
+"""The process-wide sampling profiler."""
+
+
+def _profile_dir():
+    return os.path.abspath(os.path.join(current_app.parade_context.workdir, PROFILE_DIR))
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not is_admin():
+            return Response('Admin privilege required', 403)
+        return f(*args, **kwargs)
+
+    return decorated
+
+
+@bp.route('/sampler', methods=('POST',))
+@admin_required
+def start_sampler():
+    seconds = min(request.args.get('seconds', type=float, default=30), MAX_SAMPLE_SECONDS)
+    interval = max(request.args.get('interval', type=float, default=0.01), 0.001)
+    if not sampler.start(seconds, interval):
+        return Response('Sampling profiler is already running', 409)
+    return jsonify({'started': sampler.started, 'until': sampler.until, 'interval': interval})
+
+
+@bp.route('/sampler', methods=('GET',))
+@admin_required
+def sampler_report():
+    if sampler.running and request.args.get('wait', '').lower() in ('1', 'true'):
+        sampler._thread.join(max(sampler.until - time.time(), 0) + 1)
+    response = Response(sampler.folded(), mimetype='text/plain')
+    response.headers['X-Parade-Profile-Running'] = str(sampler.running).lower()
+    response.headers['X-Parade-Profile-Samples'] = str(sampler.samples)
+    return response
+
+
+@bp.route('/reports', methods=('GET',))
+@admin_required
+def list_reports():
+    profile_dir = _profile_dir()
+    if not os.path.exists(profile_dir):
+        return jsonify([])
+    return jsonify(sorted(os.listdir(profile_dir), reverse=True))
+
+
+@bp.route('/reports/<report>', methods=('GET',))
+@admin_required
+def download_report(report):
+    return send_from_directory(_profile_dir(), report, as_attachment=True)
+
+
+def _is_dash_callback():
+    return request.path.endswith('/_dash-update-component')
+
+
+def _requested_profile_mode():
+    mode = request.args.get('__profile')
+    if not mode and _is_dash_callback() and request.referrer:
+        # the dash callbacks follow the query arguments of the dashboard page
+        mode = parse_qs(urlparse(request.referrer).query).get('__profile', [None])[0]
+        if mode:
+            mode = 'store'
+    return mode
+
+
+def _store_report(profiler):
+    profile_dir = _profile_dir()
+    os.makedirs(profile_dir, exist_ok=True)
+    target = request.endpoint or 'request'
+    if _is_dash_callback() and request.is_json:
+        target = (request.get_json(silent=True) or {}).get('output', target)
+    now = time.time()
+    report = '{}{:03d}-{}.prof'.format(time.strftime('%Y%m%d%H%M%S', time.localtime(now)), int(now * 1000) % 1000,
+                                 ''.join(c if c.isalnum() or c in '._-' else '_' for c in target)[:100])
+    profiler.dump_stats(os.path.join(profile_dir, report))
+    return report
+
+
+def init_profiling(app, context):
+    """
+    register the profiling endpoints and the request profiling hooks to the flask app
+    :param app: the flask app
+    :param context: the parade context
+    """
+    app.register_blueprint(bp)
+
+    @app.before_request
+    def start_request_profile():
+        mode = _requested_profile_mode()
+        if not mode or not is_admin():
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is active in this thread
+            return
+        g.parade_profile = (profiler, mode)
+
+    @app.after_request
+    def finish_request_profile(response):
+        profile = g.pop('parade_profile', None)
+        if profile is None:
+            return response
+        profiler, mode = profile
+        profiler.disable()
+
+        if mode == 'store' or _is_dash_callback():
+            response.headers['X-Parade-Profile'] = _store_report(profiler)
+            return response
+
+        report = io.StringIO()
+        report.write('{} {} -> {}\n\n'.format(request.method, request.full_path, response.status))
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(100)
+        return Response(report.getvalue(), mimetype='text/plain')
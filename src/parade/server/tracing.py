@@ -0,0 +1,34 @@
+# -*- coding:utf-8 -*-
+"""
+Optional tracing spans of the parade server.
+
+The spans are recorded with *opentelemetry* if it is installed (and configured
+by the deployment), otherwise they cost nothing.
+"""
+from contextlib import contextmanager
+
+
+def _tracer():
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    return trace.get_tracer('parade.server')
+
+
+_otel_tracer = _tracer()
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    trace the enclosed block as a span
+    :param name: the span name
+    :param attributes: the span attributes, the ones of None value are skipped
+    """
+    if _otel_tracer is None:
+        yield None
+        return
+    attributes = {k: v for k, v in attributes.items() if v is not None}
+    with _otel_tracer.start_as_current_span(name, attributes=attributes) as current_span:
+        yield current_span